@@ -1,57 +1,401 @@
 import hashlib
-import json
+import os
+import threading
 import time
+from bisect import bisect_left, bisect_right
+from core.canonical import encode_header, encode_legacy
+from core.mempool import AlertMempool
+from core.merkle import merkle_root
+from core.records import AlertColumns, Block
+
+
+def _has_merkle_root(block):
+    if isinstance(block, Block):
+        return block.merkle_root is not None
+    return 'merkle_root' in block
+
+
+def verify_block(block):
+    """
+    Bloğun hash'ini (ve varsa Merkle kökünü) içeriğiyle karşılaştırır.
+    Doğrulanan Block nesnelerinde sonuç `verified_hash` alanında önbelleğe alınır.
+    """
+    cached = getattr(block, 'verified_hash', None)
+    if cached is not None and cached == block['hash']:
+        return True
+    if block['hash'] != Blockchain.calculate_hash(block):
+        return False
+    if _has_merkle_root(block) and block['merkle_root'] != merkle_root(block['alerts']):
+        return False
+    if isinstance(block, Block):
+        block.verified_hash = block['hash']
+    return True
+
+
+def verify_blocks(blocks):
+    """
+    Blok hash'lerini doğrular; önbellekte doğrulanmış olanları verify_block atlar.
+    Doğrulama bu süreçte sıralı yapılır: küçük başlık/alarm girdilerinde hashlib GIL'i bırakmaz.
+    """
+    return all(verify_block(b) for b in blocks)
+
+def is_indexable_alert(alert):
+    """Alarm indekslerin ihtiyaç duyduğu şemaya uyuyor mu (str gönderen/tip, sayısal zaman damgası)?"""
+    if not isinstance(alert, dict):
+        return False
+    timestamp = alert.get('timestamp')
+    return (type(timestamp) in (int, float) and timestamp == timestamp
+            and isinstance(alert.get('sender'), str) and isinstance(alert.get('type'), str))
+
+
+def has_valid_alerts(block):
+    alerts = block['alerts']
+    if isinstance(alerts, AlertColumns):
+        return True  # sütunlu kayıtlar şemayı zaten garanti eder
+    return isinstance(alerts, list) and all(is_indexable_alert(a) for a in alerts)
+
+
+class _TimeOrderedRefs:
+    """Zaman damgasına göre sıralı (timestamp, (blok_index, alarm_pozisyonu)) listesi."""
+
+    def __init__(self):
+        self.timestamps = []
+        self.refs = []
+
+    def add(self, timestamp, ref):
+        # Alarmlar neredeyse hep sona eklenir; sıra dışı gelenler bisect ile yerleşir
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.refs.append(ref)
+        else:
+            i = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(i, timestamp)
+            self.refs.insert(i, ref)
+
+    def window(self, since=None, until=None):
+        lo = 0 if since is None else bisect_left(self.timestamps, since)
+        hi = len(self.timestamps) if until is None else bisect_right(self.timestamps, until)
+        return lo, hi
+
+    def drop_blocks_from(self, block_index):
+        keep = [i for i, ref in enumerate(self.refs) if ref[0] < block_index]
+        self.timestamps = [self.timestamps[i] for i in keep]
+        self.refs = [self.refs[i] for i in keep]
+
+
+class LedgerIndex:
+    """
+    Defter üzerinde ikincil indeksler: blok hash'i -> index, gönderen -> alarmlar,
+    alarm tipi -> alarmlar ve global zaman sıralı alarm listesi.
+    create_block ve zincir değişiminde artımlı olarak güncellenir.
+    """
+
+    def __init__(self):
+        self.by_hash = {}
+        self.by_sender = {}
+        self.by_type = {}
+        self.by_time = _TimeOrderedRefs()
+
+    def add_block(self, block):
+        self.by_hash[block['hash']] = block['index']
+        for position, alert in enumerate(block['alerts']):
+            # Şemaya uymayan (ör. eski sürümlerden kalmış) alarmlar indekslenmez; sorguları düşürmesinler
+            if not is_indexable_alert(alert):
+                continue
+            ref = (block['index'], position)
+            timestamp = alert['timestamp']
+            self.by_sender.setdefault(alert['sender'], _TimeOrderedRefs()).add(timestamp, ref)
+            self.by_type.setdefault(alert['type'], _TimeOrderedRefs()).add(timestamp, ref)
+            self.by_time.add(timestamp, ref)
+
+    def drop_blocks_from(self, block_index):
+        """Çatal çözümünde kesilen blokları (index >= block_index) indeksten çıkarır."""
+        self.by_hash = {h: i for h, i in self.by_hash.items() if i < block_index}
+        for table in (self.by_sender, self.by_type):
+            for key in list(table):
+                table[key].drop_blocks_from(block_index)
+                if not table[key].refs:
+                    del table[key]
+        self.by_time.drop_blocks_from(block_index)
+
 
 class Blockchain:
     
-    def __init__(self):
-        self.chain = []
-        self.pending_alerts = []
-        # Genesis bloğunu sabit verilerle oluşturuyoruz
-        self.create_block(previous_hash='0', sender="GENESIS") 
+    def __init__(self, storage_dir=None):
+        # storage_dir verilirse zincir diskteki append-only kayıttan okunur (bkz. core/storage.py)
+        if storage_dir:
+            from core.storage import BlockStore, PersistentChain
+            self.chain = PersistentChain(BlockStore(storage_dir, self.calculate_hash))
+        else:
+            self.chain = []
+        # Zinciri değiştiren her işlem (blok üretimi, çatal benimseme) ve indeks erişimi bu kilitle sıralanır
+        self.lock = threading.RLock()
+        # Bekleyen alarmlar sınırlı, birleştirici havuzda tutulur (bkz. core/mempool.py)
+        self.mempool = AlertMempool()
+        # İkincil indeksler ilk sorguda kurulur (büyük kalıcı defterde açılışı yavaşlatmamak için)
+        self._index = None
+        # Genesis bloğunu sabit verilerle oluşturuyoruz (diskte zincir yoksa)
+        if len(self.chain) == 0:
+            self.create_block(previous_hash='0', sender="GENESIS") 
 
     def create_block(self, previous_hash, sender=None):
-        # Eğer Genesis bloğu (index 1) ise sabit zaman değilse şimdiki zaman
-        current_time = 1700000000.0 if len(self.chain) == 0 else time.time()
+        with self.lock:
+            # Eğer Genesis bloğu (index 1) ise sabit zaman değilse şimdiki zaman
+            current_time = 1700000000.0 if len(self.chain) == 0 else time.time()
         
-        block = {
-            'index': len(self.chain) + 1,
-            'timestamp': current_time, 
-            'alerts': self.pending_alerts,
-            'previous_hash': previous_hash,
-            'sender': sender
-        }
-        # Hash hesaplama ve ekleme işlemleri
-        block['hash'] = self.calculate_hash(block)
-        self.pending_alerts = []
-        self.chain.append(block)
-        return block
+            # Bloklar kompakt kayıt olarak tutulur; JSON'a sadece API sınırında çevrilir
+            # Havuzdan en fazla max_block_alerts kayıt alınır; blok boyutu sınırlı kalır
+            alerts = self.mempool.take() if len(self.chain) else []
+            block = Block(
+                index=len(self.chain) + 1,
+                timestamp=current_time,
+                alerts=alerts,
+                merkle_root=merkle_root(alerts),
+                previous_hash=previous_hash,
+                sender=sender
+            )
+            # Hash hesaplama ve ekleme işlemleri
+            block.hash = block.verified_hash = self.calculate_hash(block)
+            self.chain.append(block)
+            if self._index is not None:
+                self._index.add_block(block)
+            return block
+
+    def mine_block(self, sender):
+        """Atomically seal pending alerts on top of the current tip; None if the pool is empty."""
+        with self.lock:
+            if not self.mempool:
+                return None
+            return self.create_block(self.get_last_block()['hash'], sender)
+
+    @property
+    def pending_alerts(self):
+        """Snapshot of the alerts waiting in the mempool."""
+        return self.mempool.snapshot()
+
     def add_alert(self, sender, alert_type, confidence):
-        alert = {
-            'sender': sender,
-            'type': alert_type,
-            'confidence': round(float(confidence), 4),
-            'timestamp': time.time()
-        }
-        self.pending_alerts.append(alert)
+        # Havuz doluysa MempoolFull yükselir; çağıran geri basınç (429/503) uygular
+        self.mempool.add(sender, alert_type, confidence)
         return self.get_last_block()['index'] + 1
 
-    
+    def add_alerts(self, sender, alert_type, confidences):
+        # Toplu tarama sonuçları için: aynı (sender, type) alarmları tek kayıtta birleşir
+        self.mempool.add_many(sender, alert_type, confidences)
+        return self.get_last_block()['index'] + 1
+
+
     @staticmethod
     def calculate_hash(block):
         # Veriyi sıralı (sort_keys) ve temiz bir stringe çeviriyoruz
         # separatos=(',', ':') ekleyerek gereksiz boşlukları siliyoruz daha kararlı hash için.
-        block_content = {k: v for k, v in block.items() if k != 'hash'}
-        block_string = json.dumps(block_content, sort_keys=True, separators=(',', ':')).encode()
-        return hashlib.sha256(block_string).hexdigest()
+        # core.canonical bu kodlamayı sabit şema için ara dict/sıralama olmadan, bayt bayt aynı üretir.
+        if _has_merkle_root(block):
+            # Alarmlar Merkle kökü ile temsil edilir; sadece kompakt başlık hash'lenir
+            block_string = encode_header(block)
+        else:
+            # Eski (Merkle öncesi) bloklar: alarmlar dahil tüm içerik
+            block_string = encode_legacy(block)
+        return hashlib.sha256(block_string.encode()).hexdigest()
 
     def get_last_block(self):
         return self.chain[-1]
 
-    def validate_chain(self, chain_to_check):
-        for i in range(1, len(chain_to_check)):
-            current = chain_to_check[i]
-            prev = chain_to_check[i-1]
-            if current['hash'] != self.calculate_hash(current): return False
+    def iter_blocks(self, start=0, stop=None):
+        """0 tabanlı [start, stop) aralığındaki blokları tek tek üretir (zincirin kopyasını oluşturmadan)."""
+        stop = len(self.chain) if stop is None else min(stop, len(self.chain))
+        scan = getattr(self.chain, 'scan', None)
+        if scan is not None:
+            yield from scan(start, stop)
+        else:
+            for position in range(start, stop):
+                try:
+                    block = self.chain[position]
+                except IndexError:
+                    return  # okuma sırasında zincir çatal benimsemeyle kısaldı
+                yield block
+
+    def validate_extension(self, fork_length, new_blocks):
+        """
+        Bizim ilk `fork_length` bloğumuzun üzerine eklenecek blokları doğrular.
+        fork_length == 0 ise new_blocks tam bir zincirdir (genesis dahil).
+        """
+        if fork_length:
+            prev = self.chain[fork_length - 1]
+            start = 0
+        elif new_blocks:
+            prev = new_blocks[0]
+            start = 1
+            if prev.get('index') != 1 or type(prev.get('index')) is not int: return False
+            if not has_valid_alerts(prev): return False
+        else:
+            return True
+        # Önce bağlantı (previous_hash, ardışık index) ve alarm şeması kontrolü: ucuz ve sıralı.
+        # Index'ler zincirdeki konumla birebir eşleşmeli; indeksler ve sorgular chain[index - 1] ile okur
+        for current in new_blocks[start:]:
             if current['previous_hash'] != prev['hash']: return False
+            index = current.get('index')
+            if type(index) is not int or index != prev['index'] + 1: return False
+            if not has_valid_alerts(current): return False
+            prev = current
+        # Sonra içerik hash'leri: sıralı, daha önce doğrulanmış bloklar önbellekten
+        return verify_blocks(new_blocks[start:])
+
+    def adopt_extension(self, fork_length, new_blocks, expected_tip=None):
+        """
+        Zinciri çatallanma noktasında keser ve doğrulanmış yeni blokları ekler.
+        expected_tip verilirse ve uç bu arada değiştiyse (ör. eşzamanlı blok üretimi) hiçbir şey yapmaz.
+
+        Returns:
+            True if the blocks were adopted
+        """
+        new_blocks = [Block.from_dict(b) for b in new_blocks]
+        for block in new_blocks:
+            # Çağıran bu blokları validate_extension ile doğrulamış olmalı
+            block.verified_hash = block['hash']
+        with self.lock:
+            if expected_tip is not None and self.get_last_block()['hash'] != expected_tip:
+                return False
+            del self.chain[fork_length:]
+            self.chain.extend(new_blocks)
+            if self._index is not None:
+                self._index.drop_blocks_from(fork_length + 1)
+                for block in new_blocks:
+                    self._index.add_block(block)
+            return True
+
+    @property
+    def ledger_index(self):
+        """Defter indeksleri; ilk erişimde zincir bir kez taranarak kurulur."""
+        with self.lock:
+            if self._index is None:
+                index = LedgerIndex()
+                for block in self.chain:
+                    index.add_block(block)
+                self._index = index
+            return self._index
+
+    def get_block_by_hash(self, block_hash):
+        with self.lock:
+            index_of_hash = getattr(self.chain, 'index_of_hash', None)
+            if index_of_hash is not None:
+                # Kalıcı zincir: diskteki hash indeksi yeterli, alarm indeksleri kurulmaz
+                position = index_of_hash(block_hash)
+                block = self.chain[position] if position >= 0 else None
+                return block if block is not None and block['hash'] == block_hash else None
+            block_index = self.ledger_index.by_hash.get(block_hash)
+            return self.chain[block_index - 1] if block_index else None
+
+    def query_alerts(self, sender=None, alert_type=None, since=None, until=None, offset=0, limit=100):
+        """
+        Gönderen / tip / zaman aralığına göre alarmları zaman sırasıyla sayfalı döndürür.
+
+        Returns:
+            (total, alerts) - alerts carry 'block_index' and 'position' fields
+        """
+        with self.lock:
+            return self._query_alerts(sender, alert_type, since, until, offset, limit)
+
+    def _query_alerts(self, sender, alert_type, since, until, offset, limit):
+        index = self.ledger_index
+        # En seçici indeksi kullan; gönderen+tip birlikteyse gönderen listesi tip ile süzülür
+        if sender is not None:
+            refs = index.by_sender.get(sender)
+        elif alert_type is not None:
+            refs = index.by_type.get(alert_type)
+        else:
+            refs = index.by_time
+        if refs is None:
+            return 0, []
+
+        lo, hi = refs.window(since, until)
+        if sender is not None and alert_type is not None:
+            # Gönderen ve tip listelerinin kesişimi: alarmları diskten okumadan, küçük liste sırasıyla
+            types = index.by_type.get(alert_type)
+            if types is None:
+                return 0, []
+            t_lo, t_hi = types.window(since, until)
+            small, large = refs.refs[lo:hi], types.refs[t_lo:t_hi]
+            if len(small) > len(large):
+                small, large = large, small
+            wanted = set(large)
+            matches = [ref for ref in small if ref in wanted]
+            total, page = len(matches), matches[offset:offset + limit]
+        else:
+            total = hi - lo
+            page = refs.refs[lo + offset:min(hi, lo + offset + limit)]
+        return total, [dict(self._alert_at(ref), block_index=ref[0], position=ref[1]) for ref in page]
+
+    def _alert_at(self, ref):
+        block_index, position = ref
+        return self.chain[block_index - 1]['alerts'][position]
+
+    def close(self):
+        """Kalıcı depolama kullanılıyorsa bekleyen yazımları diske işler."""
+        store = getattr(self.chain, 'store', None)
+        if store is not None:
+            store.close()
+
+    @staticmethod
+    def block_header(block):
+        """Alarmlar olmadan blok başlığı (senkronizasyonda çatal noktası bulmak için)."""
+        header = {k: v for k, v in block.items() if k != 'alerts'}
+        header['alert_count'] = len(block['alerts'])
+        return header
+
+    @classmethod
+    def validate_headers(cls, headers):
+        """
+        Sadece başlıklarla zincir bağlantısını doğrular (alarmlar indirilmeden).
+        Merkle kökü olmayan eski bloklar başlıktan doğrulanamaz.
+        """
+        for i, header in enumerate(headers):
+            if 'merkle_root' not in header or header['hash'] != cls.calculate_hash(header):
+                return False
+            if i and header['previous_hash'] != headers[i - 1]['hash']:
+                return False
         return True
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Block hash verification benchmark")
+    parser.add_argument('--sizes', nargs='*', type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--alerts', type=int, default=2, help='Alerts per block')
+    args = parser.parse_args()
+
+    def json_hash(block):
+        # Önceki uygulama: ara dict + json.dumps(sort_keys=True)
+        content = {k: block[k] for k in ('index', 'timestamp', 'merkle_root', 'previous_hash', 'sender')}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+    def build(n_blocks):
+        blocks, prev = [], '0'
+        for i in range(n_blocks):
+            alerts = [{'sender': f"node-{j % 7}", 'type': 'AI_ANOMALY_DETECTED',
+                       'confidence': 0.1234 + j, 'timestamp': 1700000000.0 + i} for j in range(args.alerts)]
+            block = {'index': i + 1, 'timestamp': 1700000000.0 + i, 'alerts': alerts,
+                     'merkle_root': merkle_root(alerts), 'previous_hash': prev, 'sender': 'bench'}
+            block['hash'] = prev = Blockchain.calculate_hash(block)
+            blocks.append(block)
+        return blocks
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - start
+
+    print(f"cpus={os.cpu_count()} alerts/block={args.alerts}")
+    for n in args.sizes:
+        blocks = build(n)
+        assert all(json_hash(b) == b['hash'] for b in blocks[:1000])
+        _, t_json = timed(lambda: [json_hash(b) for b in blocks])
+        _, t_canon = timed(lambda: [Blockchain.calculate_hash(b) for b in blocks])
+        ok_seq, t_seq = timed(lambda: verify_blocks(blocks))
+        compact = [Block.from_dict(b) for b in blocks]
+        verify_blocks(compact)
+        ok_cached, t_cached = timed(lambda: verify_blocks(compact))
+        assert ok_seq and ok_cached
+        print(f"{n:>9,} blocks | header hash json {t_json:7.2f}s  canonical {t_canon:7.2f}s | "
+              f"full verify {t_seq:7.2f}s  cached {t_cached:6.3f}s")
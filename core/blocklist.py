@@ -0,0 +1,225 @@
+"""
+Sentinel Mesh - Expiring Source Blocklist
+
+Blocked / rate-limited sources are kept in a store that answers "is this
+source covered?" in constant time for single addresses and in at most
+32 (IPv4) / 128 (IPv6) steps for CIDR prefixes, with expiry handled by
+a min-heap of deadlines instead of periodic scans.
+
+    exact addresses (and non-IP ids)  -> dict
+    CIDR prefixes                     -> binary radix trie over address bits
+    expiry                            -> heap of (expires_at, key), lazily purged
+
+Usage:
+    store = ExpiringPrefixStore()
+    store.add("10.0.0.0/8", ttl=300)
+    store.add("192.168.1.7")           # no ttl: never expires
+    store.match("10.1.2.3")            # -> "10.0.0.0/8"
+"""
+
+import heapq
+import ipaddress
+import socket
+import threading
+import time
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Trie düğümü: [0-çocuğu, 1-çocuğu, anahtar]
+_ZERO, _ONE, _KEY = 0, 1, 2
+
+
+def _parse_address(source: str):
+    """(version, bits, int value) of an IP address string, or None; inet_pton is far cheaper than ipaddress."""
+    try:
+        return 4, 32, int.from_bytes(socket.inet_pton(socket.AF_INET, source), 'big')
+    except OSError:
+        pass
+    try:
+        return 6, 128, int.from_bytes(socket.inet_pton(socket.AF_INET6, source), 'big')
+    except (OSError, ValueError):
+        return None
+
+
+def _normalize(source: str):
+    """
+    Return (key, network) for a source string. network is None for plain
+    addresses and non-IP identifiers, which are matched exactly.
+    """
+    if '/' in source:
+        try:
+            network = ipaddress.ip_network(source, strict=False)
+        except ValueError:
+            return source, None
+        if network.prefixlen == network.max_prefixlen:
+            return str(network.network_address), None
+        return str(network), network
+    try:
+        return str(ipaddress.ip_address(source)), None
+    except ValueError:
+        return source, None
+
+
+class ExpiringPrefixStore:
+    """
+    Set of sources (addresses or CIDR prefixes) whose entries can expire.
+
+    Writers (add/remove/purge) are serialized by a lock; `match` is lock-free
+    so the scan hot path never waits on a writer.
+
+    Attributes:
+        clock: Time source (seconds); time.time by default
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._exact: Dict[str, float] = {}      # adres -> bitiş zamanı
+        self._prefixes: Dict[str, float] = {}   # CIDR -> bitiş zamanı
+        self._tries = {4: [None, None, None], 6: [None, None, None]}
+        self._heap = []
+        self._lock = threading.RLock()
+
+    # --- Yazma ---
+
+    def add(self, source: str, ttl: Optional[float] = None) -> str:
+        """
+        Add (or refresh) a source. A None ttl never expires.
+
+        Returns:
+            The normalized key the source is stored under
+        """
+        key, network = _normalize(source)
+        with self._lock:
+            expires_at = float('inf') if ttl is None else self.clock() + ttl
+            if network is None:
+                self._exact[key] = expires_at
+            else:
+                if key not in self._prefixes:
+                    self._trie_insert(network, key)
+                self._prefixes[key] = expires_at
+            if ttl is not None:
+                heapq.heappush(self._heap, (expires_at, key))
+            self.purge()
+        return key
+
+    def remove(self, source: str) -> bool:
+        key, network = _normalize(source)
+        with self._lock:
+            if network is None:
+                return self._exact.pop(key, None) is not None
+            if self._prefixes.pop(key, None) is None:
+                return False
+            self._trie_delete(network)
+            return True
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose deadline passed; O(k log n) for k expired entries."""
+        now = self.clock() if now is None else now
+        dropped = 0
+        heap = self._heap
+        with self._lock:
+            while heap and heap[0][0] <= now:
+                expires_at, key = heapq.heappop(heap)
+                # Yenilenmiş girdilerin eski yığın kayıtları atlanır
+                if self._exact.get(key) == expires_at:
+                    del self._exact[key]
+                    dropped += 1
+                elif self._prefixes.get(key) == expires_at:
+                    self.remove(key)
+                    dropped += 1
+        return dropped
+
+    # --- Okuma ---
+
+    def match(self, source: str) -> Optional[str]:
+        """
+        Key of the live entry covering `source` (exact address first, then the
+        longest matching prefix), or None.
+        """
+        now = self.clock()
+        expires_at = self._exact.get(source)
+        if expires_at is not None and expires_at > now:
+            return source
+        if not self._prefixes and (expires_at is not None or ':' not in source):
+            return None
+        parsed = _parse_address(source)
+        if parsed is None:
+            return None
+        version, bits, value = parsed
+        if version == 6 and expires_at is None:
+            # IPv6 aynı adresi farklı yazabilir; kanonik biçimle tekrar dene
+            canonical = str(ipaddress.IPv6Address(value))
+            expires_at = self._exact.get(canonical)
+            if expires_at is not None and expires_at > now:
+                return canonical
+        node = self._tries[version]
+        best = None
+        for depth in range(bits):
+            key = node[_KEY]
+            if key is not None and self._prefixes.get(key, 0.0) > now:
+                best = key
+            node = node[(value >> (bits - 1 - depth)) & 1]
+            if node is None:
+                return best
+        return best
+
+    def __contains__(self, source: str) -> bool:
+        return self.match(source) is not None
+
+    def __len__(self) -> int:
+        self.purge()
+        return len(self._exact) + len(self._prefixes)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self.purge()
+            keys = list(self._exact) + list(self._prefixes)
+        yield from keys
+
+    def page(self, offset: int = 0, limit: int = 100) -> Tuple[int, List[dict]]:
+        """(total, one page of {"source", "expires_at"}) in insertion order; None = never expires."""
+        with self._lock:
+            self.purge()
+            entries = chain(self._exact.items(), self._prefixes.items())
+            page = [
+                {"source": key, "expires_at": None if expires_at == float('inf') else expires_at}
+                for key, expires_at in islice(entries, offset, offset + limit)
+            ]
+            return len(self._exact) + len(self._prefixes), page
+
+    def expires_at(self, source: str) -> Optional[float]:
+        key, network = _normalize(source)
+        return (self._exact if network is None else self._prefixes).get(key)
+
+    # --- Trie ---
+
+    def _trie_insert(self, network, key):
+        node = self._tries[network.version]
+        bits = network.max_prefixlen
+        value = int(network.network_address)
+        for depth in range(network.prefixlen):
+            bit = (value >> (bits - 1 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        node[_KEY] = key
+
+    def _trie_delete(self, network):
+        node = self._tries[network.version]
+        bits = network.max_prefixlen
+        value = int(network.network_address)
+        path = []
+        for depth in range(network.prefixlen):
+            bit = (value >> (bits - 1 - depth)) & 1
+            if node[bit] is None:
+                return
+            path.append((node, bit))
+            node = node[bit]
+        node[_KEY] = None
+        # Boşalan dalları kök yönünde buda
+        for parent, bit in reversed(path):
+            child = parent[bit]
+            if child[_ZERO] is None and child[_ONE] is None and child[_KEY] is None:
+                parent[bit] = None
+            else:
+                break
@@ -0,0 +1,121 @@
+"""
+Sentinel Mesh - Canonical Block Encoding
+
+Byte-for-byte equivalent of
+
+    json.dumps(content, sort_keys=True, separators=(',', ':'))
+
+for the fixed block and alert schemas, without building an intermediate
+dict or sorting keys on every call. The key order is hard-coded (already
+sorted) and scalars are encoded the same way the json module does it.
+Anything outside the schema falls back to json.dumps, so the output is
+always identical to the original encoding.
+"""
+
+import json
+from itertools import repeat
+from json.encoder import encode_basestring_ascii
+
+from core.records import AlertColumns, STRINGS
+
+_INFINITY = float('inf')
+
+
+def _generic(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+def encode_scalar(value):
+    """Encode str/float/int/bool/None exactly like json.dumps (ensure_ascii=True)."""
+    kind = type(value)
+    if kind is str:
+        return encode_basestring_ascii(value)
+    if kind is float:
+        if value != value:
+            return 'NaN'
+        if value == _INFINITY:
+            return 'Infinity'
+        if value == -_INFINITY:
+            return '-Infinity'
+        return float.__repr__(value)
+    if kind is int:
+        return int.__repr__(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return _generic(value)
+
+
+def _encode_count(count):
+    # 'count' yalnızca birleştirilmiş alarmlarda var; sıralı anahtar düzeninde confidence'tan sonra gelir
+    return ',"count":' + int.__repr__(count) if count else ''
+
+
+def encode_alert(alert):
+    """Canonical JSON of one alert dict (keys: confidence, [count,] sender, timestamp, type)."""
+    if type(alert) is not dict or len(alert) not in (4, 5):
+        return _generic(alert)
+    count = alert.get('count') if len(alert) == 5 else None
+    if len(alert) == 5 and (type(count) is not int or count == 0):
+        return _generic(alert)
+    try:
+        return (
+            '{"confidence":' + encode_scalar(alert['confidence'])
+            + _encode_count(count)
+            + ',"sender":' + encode_scalar(alert['sender'])
+            + ',"timestamp":' + encode_scalar(alert['timestamp'])
+            + ',"type":' + encode_scalar(alert['type']) + '}'
+        )
+    except KeyError:
+        return _generic(alert)
+
+
+def iter_encoded_alerts(alerts):
+    """Canonical JSON for each alert; reads AlertColumns directly without building dicts."""
+    if isinstance(alerts, AlertColumns):
+        strings = STRINGS.strings
+        counts = alerts.count if alerts.count is not None else repeat(0)
+        for confidence, count, sender_id, timestamp, type_id in zip(
+                alerts.confidence, counts, alerts.sender_id, alerts.timestamp, alerts.type_id):
+            yield (
+                '{"confidence":' + encode_scalar(confidence)
+                + _encode_count(count)
+                + ',"sender":' + encode_basestring_ascii(strings[sender_id])
+                + ',"timestamp":' + encode_scalar(timestamp)
+                + ',"type":' + encode_basestring_ascii(strings[type_id]) + '}'
+            )
+    else:
+        for alert in alerts:
+            yield encode_alert(alert)
+
+
+def encode_header(block):
+    """Canonical JSON of a Merkle block header (index, merkle_root, previous_hash, sender, timestamp)."""
+    return (
+        '{"index":' + encode_scalar(block['index'])
+        + ',"merkle_root":' + encode_scalar(block['merkle_root'])
+        + ',"previous_hash":' + encode_scalar(block['previous_hash'])
+        + ',"sender":' + encode_scalar(block['sender'])
+        + ',"timestamp":' + encode_scalar(block['timestamp']) + '}'
+    )
+
+
+_LEGACY_KEYS = {'alerts', 'index', 'previous_hash', 'sender', 'timestamp'}
+
+
+def encode_legacy(block):
+    """Canonical JSON of a pre-Merkle block: all fields except 'hash', alerts included."""
+    keys = set(block.keys())
+    keys.discard('hash')
+    if keys != _LEGACY_KEYS:
+        return _generic({k: v for k, v in block.items() if k != 'hash'})
+    return (
+        '{"alerts":[' + ','.join(iter_encoded_alerts(block['alerts'])) + ']'
+        + ',"index":' + encode_scalar(block['index'])
+        + ',"previous_hash":' + encode_scalar(block['previous_hash'])
+        + ',"sender":' + encode_scalar(block['sender'])
+        + ',"timestamp":' + encode_scalar(block['timestamp']) + '}'
+    )
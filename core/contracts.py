@@ -8,10 +8,17 @@ Smart contracts are predefined rules that execute automatically
 when certain conditions are met (e.g., anomaly confidence > threshold).
 """
 
+import json
+import threading
 import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
 from enum import Enum
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.blocklist import ExpiringPrefixStore
+from core.offense import CooldownTracker, SlidingWindowCounter
 
 
 class ActionType(Enum):
@@ -22,6 +29,10 @@ class ActionType(Enum):
     ALERT_NETWORK = "ALERT_NETWORK" # Broadcast alert to all peers
 
 
+# Actions aimed at a specific source; skipped when an alert's source is unknown
+PER_SOURCE_ACTIONS = frozenset({ActionType.BLOCK_IP, ActionType.RATE_LIMIT, ActionType.QUARANTINE})
+
+
 class TriggerType(Enum):
     """Events that can trigger a contract."""
     ANOMALY_DETECTED = "ANOMALY_DETECTED"
@@ -39,8 +50,9 @@ class Contract:
         action: The defensive action to take
         trigger: What event triggers this contract
         threshold: Minimum confidence/MSE to activate (0.0 - 1.0)
-        cooldown: Seconds before this contract can trigger again
+        cooldown: Seconds before this contract can trigger again for the same source
         enabled: Whether this contract is active
+        repeat_count: Offenses within the engine's offense window needed by REPEATED_OFFENSE
     """
     name: str
     action: ActionType
@@ -48,6 +60,7 @@ class Contract:
     threshold: float = 0.0
     cooldown: int = 60
     enabled: bool = True
+    repeat_count: int = 3
     last_triggered: float = 0.0
 
 
@@ -59,6 +72,74 @@ class ExecutedAction:
     timestamp: float
     details: dict = field(default_factory=dict)
 
+    def to_dict(self) -> dict:
+        return {
+            "contract": self.contract_name,
+            "action": self.action.value,
+            "time": self.timestamp,
+            "details": self.details
+        }
+
+
+class ActionHistory:
+    """
+    Fixed-capacity ring buffer of executed actions with running counters.
+
+    Only the newest `capacity` actions are kept in memory; if `spill_path`
+    is given every action is also appended to that file as one JSON line,
+    so the full history survives without growing the process.
+    Per-action and per-contract totals are updated on append, so summaries
+    never scan the history. Safe to read from other threads while appending.
+    """
+
+    def __init__(self, capacity: int = 1000, spill_path: Optional[str] = None):
+        self.capacity = capacity
+        self._ring = deque(maxlen=capacity)
+        self.total = 0
+        self.by_action = Counter()
+        self.by_contract = Counter()
+        self.spill_path = spill_path
+        self._spill = open(spill_path, 'a', encoding='utf-8') if spill_path else None
+        self._lock = threading.Lock()
+
+    def append(self, action: ExecutedAction):
+        with self._lock:
+            self._ring.append(action)
+            self.total += 1
+            self.by_action[action.action.value] += 1
+            self.by_contract[action.contract_name] += 1
+            if self._spill is not None:
+                self._spill.write(json.dumps(action.to_dict(), separators=(',', ':')) + '\n')
+                self._spill.flush()
+
+    def recent(self, n: int) -> List[ExecutedAction]:
+        """Newest `n` actions, oldest first."""
+        with self._lock:
+            n = min(n, len(self._ring))
+            return [self._ring[i] for i in range(len(self._ring) - n, len(self._ring))]
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[ExecutedAction]:
+        """Retained actions newest first, skipping `offset`."""
+        with self._lock:
+            end = max(0, len(self._ring) - offset)
+            return [self._ring[i] for i in range(end - 1, max(-1, end - 1 - limit), -1)]
+
+    def counters(self) -> Tuple[int, dict, dict]:
+        with self._lock:
+            return self.total, dict(self.by_action), dict(self.by_contract)
+
+    def __len__(self):
+        return len(self._ring)
+
+    def __iter__(self):
+        return iter(self._ring)
+
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
 
 class ContractEngine:
     """
@@ -68,7 +149,9 @@ class ContractEngine:
     these actions would interface with firewalls, load balancers, etc.
     """
     
-    def __init__(self):
+    def __init__(self, block_ttl: Optional[float] = 3600, rate_limit_ttl: float = 300,
+                 offense_window: float = 300, max_tracked_sources: int = 65536,
+                 history_size: int = 1000, history_path: Optional[str] = None):
         # Default contracts - can be customized
         self.contracts: List[Contract] = [
             Contract(
@@ -92,54 +175,204 @@ class ContractEngine:
                 threshold=0.0,  # Always alert on any anomaly
                 cooldown=10
             ),
+            Contract(
+                name="Quarantine Repeat Offender",
+                action=ActionType.QUARANTINE,
+                trigger=TriggerType.REPEATED_OFFENSE,
+                threshold=0.05,
+                cooldown=300,
+                repeat_count=3  # 3 anomalies from one source within the offense window
+            ),
         ]
         
-        # History of executed actions
-        self.action_history: List[ExecutedAction] = []
+        # History of executed actions (bounded; optionally spilled to disk)
+        self.action_history = ActionHistory(capacity=history_size, spill_path=history_path)
         
-        # Simulated blocklist (in real system, this would be firewall rules)
-        self.blocked_ips: set = set()
-        self.rate_limited: dict = {}  # IP -> limit_until timestamp
+        # Simulated blocklist (in real system, this would be firewall rules).
+        # Entries expire on their own and may be single IPs or CIDR prefixes.
+        self.block_ttl = block_ttl
+        self.rate_limit_ttl = rate_limit_ttl
+        self.blocked_ips = ExpiringPrefixStore()
+        self.rate_limited = ExpiringPrefixStore()
+
+        # Per-source offense counts and cooldowns (LRU-bounded, so memory stays
+        # fixed no matter how many distinct sources are seen)
+        self.offenses = SlidingWindowCounter(window=offense_window, capacity=max_tracked_sources)
+        self.cooldowns = CooldownTracker(capacity=max_tracked_sources)
+
+        # Evaluation, contract edits and status reads are serialized; blocklist
+        # lookups (is_blocked/source_status) stay lock-free for the scan hot path
+        self._lock = threading.RLock()
+
+        # ALERT_NETWORK hook: callable(threat dict) -> id, set by the node to its gossip layer
+        self.broadcast: Optional[Callable[[dict], str]] = None
+        # Optional callable(ExecutedAction) notified of every executed action (event stream)
+        self.on_action: Optional[Callable[[ExecutedAction], None]] = None
+
+        # Compiled dispatch table, rebuilt only when the contract set changes.
+        # Contracts are edited through the engine methods below, which bump _version.
+        self._dispatch: Dict[TriggerType, Tuple[List[float], List[Tuple[int, Contract]]]] = {}
+        self._version = 0
+        self._dispatch_version = None
+        self._anomaly_types: Dict[str, bool] = {}
+        self._enabled_count = 0
+
+    def add_contract(self, contract: Contract):
+        """Register a new contract (the dispatch table is rebuilt lazily)."""
+        with self._lock:
+            self.contracts.append(contract)
+            self._version += 1
+
+    def remove_contract(self, name: str) -> bool:
+        """Remove a contract by name. Returns True if one was removed."""
+        with self._lock:
+            before = len(self.contracts)
+            self.contracts = [c for c in self.contracts if c.name != name]
+            self._version += 1
+            return len(self.contracts) != before
+
+    def update_contract(self, name: str, **changes) -> bool:
+        """
+        Change fields of a contract by name (e.g. threshold=0.2, enabled=False).
+        Returns True if the contract exists; unknown fields raise ValueError.
+        """
+        editable = {f.name for f in fields(Contract)} - {"name", "last_triggered"}
+        unknown = set(changes) - editable
+        if unknown:
+            raise ValueError(f"Unknown contract fields: {sorted(unknown)}")
+        with self._lock:
+            for contract in self.contracts:
+                if contract.name == name:
+                    for key, value in changes.items():
+                        setattr(contract, key, value)
+                    self._version += 1
+                    return True
+            return False
+
+    def enable_contract(self, name: str) -> bool:
+        return self.update_contract(name, enabled=True)
+
+    def disable_contract(self, name: str) -> bool:
+        return self.update_contract(name, enabled=False)
+
+    def _compiled(self) -> Dict[TriggerType, Tuple[List[float], List[Tuple[int, Contract]]]]:
+        """
+        Return the dispatch table: for each trigger, enabled contracts sorted by
+        threshold (with their original position) plus the parallel threshold list
+        for bisect. Recompiled only when contracts were added/removed/edited.
+        """
+        if self._version != self._dispatch_version:
+            dispatch = {}
+            self._enabled_count = sum(1 for c in self.contracts if c.enabled)
+            for position, contract in enumerate(self.contracts):
+                if contract.enabled:
+                    dispatch.setdefault(contract.trigger, []).append((contract.threshold, position, contract))
+            self._dispatch = {}
+            for trigger, entries in dispatch.items():
+                entries.sort(key=lambda e: (e[0], e[1]))
+                self._dispatch[trigger] = ([e[0] for e in entries], [(e[1], e[2]) for e in entries])
+            self._dispatch_version = self._version
+        return self._dispatch
+
+    def _is_anomaly_type(self, alert_type: str) -> bool:
+        # String 'in' test cached per distinct alert type
+        matched = self._anomaly_types.get(alert_type)
+        if matched is None:
+            if len(self._anomaly_types) >= 1024:
+                self._anomaly_types.clear()
+            matched = self._anomaly_types[alert_type] = "ANOMALY" in alert_type
+        return matched
+
+    def _matching(self, dispatch, alert_type: str, confidence: float, offenses: int) -> List[Tuple[int, Contract]]:
+        """All enabled contracts whose trigger and threshold match, in original order."""
+        matches = []
+        if self._is_anomaly_type(alert_type) and TriggerType.ANOMALY_DETECTED in dispatch:
+            thresholds, entries = dispatch[TriggerType.ANOMALY_DETECTED]
+            matches.extend(entries[:bisect_right(thresholds, confidence)])  # threshold <= confidence
+        if TriggerType.HIGH_CONFIDENCE in dispatch:
+            thresholds, entries = dispatch[TriggerType.HIGH_CONFIDENCE]
+            matches.extend(entries[:bisect_left(thresholds, confidence)])   # threshold < confidence
+        if TriggerType.REPEATED_OFFENSE in dispatch:
+            thresholds, entries = dispatch[TriggerType.REPEATED_OFFENSE]
+            matches.extend(e for e in entries[:bisect_right(thresholds, confidence)]
+                           if offenses >= e[1].repeat_count)
+        matches.sort(key=lambda e: e[0])
+        return matches
     
-    def evaluate(self, alert_type: str, confidence: float, source_ip: str = "unknown") -> List[ExecutedAction]:
+    def evaluate(self, alert_type: str, confidence: float, source_ip: Optional[str] = None) -> List[ExecutedAction]:
         """
         Evaluate all contracts against an alert and execute matching ones.
         
         Args:
             alert_type: Type of alert (e.g., "AI_ANOMALY_DETECTED")
             confidence: The MSE/confidence score from AI
-            source_ip: Source of the suspicious traffic (simulated)
+            source_ip: Source of the suspicious traffic; None if unknown, in which
+                case no offense is counted and per-source actions are skipped
             
         Returns:
             List of actions that were executed
         """
-        executed = []
-        current_time = time.time()
+        with self._lock:
+            return self._evaluate_one(self._compiled(), alert_type, confidence, source_ip, time.time())
+
+    def evaluate_batch(self, alert_types: Sequence[str], confidences: Sequence[float],
+                       source_ips: Sequence[Optional[str]]) -> List[ExecutedAction]:
+        """
+        Evaluate many alerts in one pass; same result as calling `evaluate` for each in order.
         
-        for contract in self.contracts:
-            if not contract.enabled:
+        Args:
+            alert_types: Alert type per alert
+            confidences: MSE/confidence score per alert
+            source_ips: Source of each alert (None where unknown)
+            
+        Returns:
+            All actions that were executed, in alert order
+        """
+        executed = []
+        with self._lock:
+            current_time = time.time()
+            dispatch = self._compiled()
+            for alert_type, confidence, source_ip in zip(alert_types, confidences, source_ips):
+                executed.extend(self._evaluate_one(dispatch, alert_type, float(confidence), source_ip, current_time))
+        return executed
+
+    def _evaluate_one(self, dispatch, alert_type: str, confidence: float, source_ip: Optional[str],
+                      current_time: float) -> List[ExecutedAction]:
+        # Her uyarı kaynağı için bir ihlal sayılır; kaynağı bilinmeyen uyarı kimseye yazılmaz
+        offenses = self.offenses.hit(source_ip, current_time) if source_ip is not None else 0
+        executed = []
+        for _, contract in self._matching(dispatch, alert_type, confidence, offenses):
+            if source_ip is None and contract.action in PER_SOURCE_ACTIONS:
                 continue
-                
-            # Check cooldown
-            if current_time - contract.last_triggered < contract.cooldown:
+            # Check cooldown (per source: one noisy IP doesn't silence the contract for others)
+            key = (contract.name, source_ip)
+            if not self.cooldowns.ready(key, current_time):
                 continue
             
-            # Check if trigger matches
-            trigger_matched = False
-            if contract.trigger == TriggerType.ANOMALY_DETECTED and "ANOMALY" in alert_type:
-                trigger_matched = True
-            elif contract.trigger == TriggerType.HIGH_CONFIDENCE and confidence > contract.threshold:
-                trigger_matched = True
-            
-            # Execute if conditions met
-            if trigger_matched and confidence >= contract.threshold:
-                action = self._execute_action(contract, source_ip, confidence)
-                contract.last_triggered = current_time
-                executed.append(action)
-                self.action_history.append(action)
+            action = self._execute_action(contract, source_ip, confidence)
+            contract.last_triggered = current_time
+            self.cooldowns.start(key, contract.cooldown, current_time)
+            executed.append(action)
+            self.action_history.append(action)
+            if self.on_action is not None:
+                self.on_action(action)
         
         return executed
     
+    def source_status(self, source_ip: str) -> Optional[str]:
+        """
+        Hot-path lookup: "blocked", "rate_limited" or None for a source.
+        Callers check this before scoring traffic so blocked sources skip inference.
+        """
+        if self.blocked_ips.match(source_ip) is not None:
+            return "blocked"
+        if self.rate_limited.match(source_ip) is not None:
+            return "rate_limited"
+        return None
+
+    def is_blocked(self, source_ip: str) -> bool:
+        return self.blocked_ips.match(source_ip) is not None
+
     def _execute_action(self, contract: Contract, source_ip: str, confidence: float) -> ExecutedAction:
         """
         Execute a contract's action (simulated).
@@ -156,21 +389,33 @@ class ContractEngine:
         }
         
         if contract.action == ActionType.BLOCK_IP:
-            self.blocked_ips.add(source_ip)
+            self.blocked_ips.add(source_ip, ttl=self.block_ttl)
             details["message"] = f"IP {source_ip} added to blocklist"
             print(f"CONTRACT EXECUTED: {contract.name} - Blocked {source_ip}")
             
         elif contract.action == ActionType.RATE_LIMIT:
-            self.rate_limited[source_ip] = time.time() + 300  # 5 min limit
-            details["message"] = f"IP {source_ip} rate limited for 5 minutes"
+            self.rate_limited.add(source_ip, ttl=self.rate_limit_ttl)
+            details["message"] = f"IP {source_ip} rate limited for {self.rate_limit_ttl / 60:g} minutes"
             print(f"CONTRACT EXECUTED: {contract.name} - Rate limiting {source_ip}")
             
         elif contract.action == ActionType.QUARANTINE:
             details["message"] = f"Traffic from {source_ip} quarantined for analysis"
+            details["offenses"] = self.offenses.count(source_ip, time.time())
             print(f"CONTRACT EXECUTED: {contract.name} - Quarantined {source_ip}")
             
         elif contract.action == ActionType.ALERT_NETWORK:
-            details["message"] = "Alert broadcasted to all peer nodes"
+            if self.broadcast is not None:
+                details["gossip_id"] = self.broadcast({
+                    "type": "THREAT_DETECTED",
+                    "source_ip": source_ip,
+                    "confidence": round(confidence, 4),
+                    "timestamp": time.time(),
+                    "contract": contract.name
+                })
+                details["simulated"] = False
+                details["message"] = "Alert queued for gossip to peer nodes"
+            else:
+                details["message"] = "Alert broadcasted to all peer nodes"
             print(f"CONTRACT EXECUTED: {contract.name} - Network alert sent")
         
         return ExecutedAction(
@@ -180,25 +425,39 @@ class ContractEngine:
             details=details
         )
     
-    def get_status(self) -> dict:
-        """Return current contract engine status."""
+    def get_status(self, recent: int = 5) -> dict:
+        """
+        Return current contract engine status.
+
+        Every field is a counter or a fixed-size sample, so the cost does not
+        grow with uptime; use `get_blocklist` / `action_history.page` for the full lists.
+        """
+        with self._lock:
+            self._compiled()  # enabled sayısını güncel tutar
+            total_contracts, enabled, tracked = len(self.contracts), self._enabled_count, len(self.offenses)
+        total, by_action, by_contract = self.action_history.counters()
         return {
-            "total_contracts": len(self.contracts),
-            "enabled_contracts": sum(1 for c in self.contracts if c.enabled),
-            "blocked_ips": list(self.blocked_ips),
+            "total_contracts": total_contracts,
+            "enabled_contracts": enabled,
+            "blocked_count": len(self.blocked_ips),
             "rate_limited_count": len(self.rate_limited),
-            "total_actions_executed": len(self.action_history),
-            "recent_actions": [
-                {
-                    "contract": a.contract_name,
-                    "action": a.action.value,
-                    "time": a.timestamp,
-                    "details": a.details
-                }
-                for a in self.action_history[-5:]  # Last 5 actions
-            ]
+            "tracked_sources": tracked,
+            "total_actions_executed": total,
+            "actions_by_type": by_action,
+            "actions_by_contract": by_contract,
+            "recent_actions": [a.to_dict() for a in self.action_history.recent(recent)]
         }
-    
+
+    def get_blocklist(self, kind: str = "blocked", offset: int = 0, limit: int = 100) -> Tuple[int, List[dict]]:
+        """
+        One page of the blocklist ("blocked") or rate-limit list ("rate_limited").
+
+        Returns:
+            (total entries, [{"source": ..., "expires_at": epoch or None}])
+        """
+        store = self.blocked_ips if kind == "blocked" else self.rate_limited
+        return store.page(offset, limit)
+
     def get_contracts_info(self) -> List[dict]:
         """Return info about all contracts."""
         return [
@@ -208,7 +467,8 @@ class ContractEngine:
                 "trigger": c.trigger.value,
                 "threshold": c.threshold,
                 "cooldown": c.cooldown,
-                "enabled": c.enabled
+                "enabled": c.enabled,
+                "repeat_count": c.repeat_count
             }
             for c in self.contracts
         ]
@@ -0,0 +1,72 @@
+"""
+Sentinel Mesh - Node Event Log
+
+Sequence-numbered, fixed-capacity log of node events (new block, new
+pending alert, contract executed, peer change, reputation change) that
+backs the push endpoints in node.py.
+
+Every event gets the next sequence number, so a client that lost its
+connection resumes with "everything after N". If N has already fallen
+out of the ring buffer (or comes from a previous run of the node) the
+client is told to reset, i.e. refetch full state once, instead of
+silently missing events.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import List, Tuple
+
+
+class EventLog:
+    """
+    Thread-safe ring buffer of events with blocking reads.
+
+    Attributes:
+        capacity: Number of most recent events kept for resuming clients
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._events = deque(maxlen=capacity)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, event_type: str, data: dict) -> int:
+        """Append an event and wake up waiting readers; returns its sequence number."""
+        with self._cond:
+            self._seq += 1
+            self._events.append({"seq": self._seq, "type": event_type, "time": time.time(), "data": data})
+            self._cond.notify_all()
+            return self._seq
+
+    def _since(self, seq: int, limit: int) -> Tuple[List[dict], bool]:
+        events = self._events
+        if not events:
+            return [], seq > self._seq
+        first = events[0]["seq"]
+        reset = seq > self._seq or seq < first - 1
+        start = 0 if reset else seq - first + 1  # sıra numaraları ardışık
+        stop = min(len(events), start + limit)
+        return [events[i] for i in range(start, stop)], reset
+
+    def since(self, seq: int, limit: int = 1000) -> Tuple[List[dict], bool]:
+        """
+        Events after `seq`, oldest first.
+
+        Returns:
+            (events, reset) - reset is True when `seq` can't be resumed from
+            (evicted or from an earlier run); events then start at the oldest kept one
+        """
+        with self._cond:
+            return self._since(seq, limit)
+
+    def wait(self, seq: int, timeout: float, limit: int = 1000) -> Tuple[List[dict], bool]:
+        """Like `since`, but blocks up to `timeout` seconds until something newer than `seq` exists."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq, timeout)
+            return self._since(seq, limit)
@@ -0,0 +1,183 @@
+"""
+Sentinel Mesh - Alert Gossip
+
+Pushes threat alerts to peers as soon as they are raised instead of
+waiting for the next block and /nodes/resolve:
+
+- every alert gets a content id (SHA-256 of its canonical JSON), so a
+  node that receives the same alert twice - directly or relayed - drops
+  it with one set lookup (`SeenSet`, bounded FIFO);
+- outgoing alerts are coalesced for at most `flush_ms` (or until
+  `batch_size` are queued) and each batch goes to `fanout` random peers,
+  not to every peer, so traffic grows with batches x fanout rather than
+  peers x alerts;
+- relayed alerts carry a hop budget (`ttl`) that bounds how far they
+  travel through the mesh.
+
+The transport is injected (`send(peer, payload)`), so this module has no
+HTTP or Flask dependency.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Iterable, List
+
+
+def alert_id(alert: dict) -> str:
+    """Content id of an alert: SHA-256 over its canonical JSON, relay fields excluded."""
+    content = {k: v for k, v in alert.items() if k not in ('id', 'ttl')}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+class SeenSet:
+    """Bounded set of recently seen ids; O(1) add/lookup, oldest ids forgotten first."""
+
+    def __init__(self, capacity: int = 100000):
+        self.capacity = capacity
+        self._ids: OrderedDict = OrderedDict()
+
+    def add(self, item_id: str) -> bool:
+        """Mark as seen. Returns False if it was already seen."""
+        if item_id in self._ids:
+            return False
+        self._ids[item_id] = None
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+        return True
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class GossipBatcher:
+    """
+    Time-bounded batching and fan-out of alerts to peers.
+
+    Attributes:
+        send: Callable(peer, payload) doing the actual delivery
+        peers: Callable returning the current peer list
+        fanout: Peers each batch is sent to
+        batch_size: Flush as soon as this many alerts are queued...
+        flush_ms: ...or this long after the first alert of the batch was queued
+        ttl: Hop budget given to alerts published by this node
+        max_queue: Outgoing queue bound; the oldest alerts are dropped beyond it
+        executor: Optional executor so sends to the fan-out peers run concurrently
+    """
+
+    def __init__(self, send: Callable[[str, dict], None], peers: Callable[[], Iterable[str]], origin: str,
+                 fanout: int = 3, batch_size: int = 64, flush_ms: float = 50.0, ttl: int = 3,
+                 max_queue: int = 10000, seen_capacity: int = 100000, executor=None):
+        self.send = send
+        self.executor = executor
+        self.peers = peers
+        self.origin = origin
+        self.fanout = fanout
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.ttl = ttl
+        self.seen = SeenSet(seen_capacity)
+
+        self._queue = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._first_queued = None
+        self.stats = {"published": 0, "relayed": 0, "received": 0, "duplicates": 0,
+                      "batches_sent": 0, "send_errors": 0, "dropped": 0}
+        self._worker = threading.Thread(target=self._run, name="gossip", daemon=True)
+        self._worker.start()
+
+    # --- Gönderme ---
+
+    def _enqueue(self, alert: dict):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.stats["dropped"] += 1
+            self._queue.append(alert)
+            if self._first_queued is None:
+                self._first_queued = time.monotonic()
+            self._cond.notify()
+
+    def publish(self, alert: dict) -> str:
+        """Queue a locally raised alert for gossip; returns its content id."""
+        alert = dict(alert)
+        alert['id'] = alert_id(alert)
+        alert['ttl'] = self.ttl
+        with self._cond:
+            self.seen.add(alert['id'])
+            self.stats["published"] += 1
+        self._enqueue(alert)
+        return alert['id']
+
+    def _next_batch(self) -> List[dict]:
+        with self._cond:
+            while True:
+                if self._queue:
+                    waited = (time.monotonic() - self._first_queued) * 1000.0
+                    if len(self._queue) >= self.batch_size or waited >= self.flush_ms:
+                        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                        self._first_queued = time.monotonic() if self._queue else None
+                        return batch
+                    self._cond.wait((self.flush_ms - waited) / 1000.0)
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            peers = list(self.peers())
+            if not peers:
+                continue
+            payload = {"origin": self.origin, "alerts": batch}
+            for peer in random.sample(peers, min(self.fanout, len(peers))):
+                if self.executor is not None:
+                    self.executor.submit(self.send, peer, payload).add_done_callback(self._sent)
+                    continue
+                try:
+                    self.send(peer, payload)
+                    self._record_send(True)
+                except Exception:
+                    self._record_send(False)
+
+    def _sent(self, future):
+        self._record_send(future.exception() is None)
+
+    def _record_send(self, ok: bool):
+        with self._cond:
+            self.stats["batches_sent" if ok else "send_errors"] += 1
+
+    # --- Alma ---
+
+    def receive(self, alerts: List[dict]) -> List[dict]:
+        """
+        Accept a batch from a peer. Returns only the alerts not seen before;
+        those with hops left are queued for relay.
+        """
+        fresh = []
+        for alert in alerts:
+            item_id = alert_id(alert)
+            with self._cond:
+                self.stats["received"] += 1
+                if not self.seen.add(item_id):
+                    self.stats["duplicates"] += 1
+                    continue
+            alert = dict(alert, id=item_id)
+            fresh.append(alert)
+            ttl = alert.get('ttl')
+            # Peer'dan gelen atlama bütçesi kendi ttl'imizle sınırlanır
+            ttl = min(ttl, self.ttl) - 1 if isinstance(ttl, int) else 0
+            if ttl > 0:
+                with self._cond:
+                    self.stats["relayed"] += 1
+                self._enqueue(dict(alert, ttl=ttl))
+        return fresh
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return dict(self.stats, queued=len(self._queue), seen=len(self.seen), fanout=self.fanout,
+                        batch_size=self.batch_size, flush_ms=self.flush_ms)
@@ -0,0 +1,174 @@
+"""
+Sentinel Mesh - Alert Mempool
+
+Bounded pool of alerts waiting to be sealed into a block.
+
+- Capacity: at most `capacity` entries are pending; adding a new entry
+  to a full pool raises MempoolFull so the API can push back (429/503).
+- Coalescing: alerts with the same (sender, type) arriving within
+  `coalesce_window` seconds of the first one are merged into a single
+  entry (max confidence, 'count' of merged alerts), so an alert flood
+  costs one entry per source and type instead of one per alert.
+- Sealing: blocks take at most `max_block_alerts` entries, oldest first,
+  and `wait_for_seal` lets a background sealer sleep until the pool is
+  full enough or old enough.
+
+Entries keep the on-chain alert schema; only coalesced entries carry the
+extra 'count' key.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+
+class MempoolFull(Exception):
+    """Raised when an alert would need a new entry but the pool is at capacity."""
+
+    def __init__(self, capacity: int):
+        super().__init__(f"Alert mempool is full ({capacity} entries)")
+        self.capacity = capacity
+
+
+class AlertMempool:
+    """
+    Thread-safe, bounded, coalescing alert pool.
+
+    Attributes:
+        capacity: Maximum number of pending entries
+        coalesce_window: Seconds during which same (sender, type) alerts merge; 0 disables
+        max_block_alerts: Maximum entries sealed into one block
+    """
+
+    def __init__(self, capacity: int = 10000, coalesce_window: float = 1.0, max_block_alerts: int = 1000):
+        self.capacity = capacity
+        self.coalesce_window = coalesce_window
+        self.max_block_alerts = max_block_alerts
+        self._entries = deque()
+        self._open = {}  # (sender, type) -> birleştirmeye açık kayıt
+        self._cond = threading.Condition()
+        self.accepted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        # Optional callable(sender, alert_type, count, confidence), called once per accepted add,
+        # after the pool lock is released
+        self.on_add = None
+
+    def _merge(self, sender, alert_type, confidence, count, now):
+        key = (sender, alert_type)
+        entry = self._open.get(key) if self.coalesce_window > 0 else None
+        if entry is not None and now - entry['timestamp'] <= self.coalesce_window:
+            entry['confidence'] = max(entry['confidence'], confidence)
+            entry['count'] = entry.get('count', 1) + count
+            self.coalesced += count
+            return
+        if len(self._entries) >= self.capacity:
+            self.rejected += count
+            raise MempoolFull(self.capacity)
+        entry = {
+            'sender': sender,
+            'type': alert_type,
+            'confidence': confidence,
+            'timestamp': now
+        }
+        if count > 1:
+            entry['count'] = count
+            self.coalesced += count - 1
+        self._entries.append(entry)
+        if self.coalesce_window > 0:
+            self._open[key] = entry
+
+    def add(self, sender, alert_type, confidence, now: Optional[float] = None):
+        """Add one alert (merged into an open entry when possible)."""
+        now = time.time() if now is None else now
+        with self._cond:
+            confidence = round(float(confidence), 4)
+            self._merge(sender, alert_type, confidence, 1, now)
+            self.accepted += 1
+            self._cond.notify_all()
+        if self.on_add is not None:
+            self.on_add(sender, alert_type, 1, confidence)
+
+    def add_many(self, sender, alert_type, confidences, now: Optional[float] = None):
+        """
+        Add a batch of alerts sharing sender and type, all or nothing.
+        With coalescing on they become a single entry.
+        """
+        now = time.time() if now is None else now
+        confidences = [round(float(c), 4) for c in confidences]
+        if not confidences:
+            return
+        with self._cond:
+            if self.coalesce_window > 0:
+                self._merge(sender, alert_type, max(confidences), len(confidences), now)
+            else:
+                if len(self._entries) + len(confidences) > self.capacity:
+                    self.rejected += len(confidences)
+                    raise MempoolFull(self.capacity)
+                for confidence in confidences:
+                    self._merge(sender, alert_type, confidence, 1, now)
+            self.accepted += len(confidences)
+            self._cond.notify_all()
+        if self.on_add is not None:
+            self.on_add(sender, alert_type, len(confidences), max(confidences))
+
+    def take(self, limit: Optional[int] = None) -> List[dict]:
+        """Remove and return up to `limit` (default max_block_alerts) oldest entries."""
+        limit = self.max_block_alerts if limit is None else limit
+        with self._cond:
+            taken = [self._entries.popleft() for _ in range(min(limit, len(self._entries)))]
+            for entry in taken:
+                key = (entry['sender'], entry['type'])
+                if self._open.get(key) is entry:
+                    del self._open[key]
+            return taken
+
+    def oldest_age(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._cond:
+            return now - self._entries[0]['timestamp'] if self._entries else 0.0
+
+    def wait_for_seal(self, min_entries: int, max_age: float, timeout: float) -> bool:
+        """
+        Block until at least `min_entries` are pending or the oldest pending entry
+        is `max_age` seconds old (returns True), or until `timeout` passes (False).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._entries:
+                    if len(self._entries) >= min_entries:
+                        return True
+                    age = time.time() - self._entries[0]['timestamp']
+                    if age >= max_age:
+                        return True
+                    wait = max_age - age
+                else:
+                    wait = timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(wait, remaining))
+
+    def snapshot(self) -> List[dict]:
+        with self._cond:
+            return [dict(entry) for entry in self._entries]
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._entries),
+                "capacity": self.capacity,
+                "coalesce_window": self.coalesce_window,
+                "max_block_alerts": self.max_block_alerts,
+                "accepted": self.accepted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
@@ -0,0 +1,82 @@
+"""
+Sentinel Mesh - Merkle Trees over Block Alerts
+
+Each block commits to its alerts through a Merkle root, so the block
+hash only covers a compact header and a single alert can be proven to
+be on-chain with O(log n) sibling hashes.
+
+Leaves and inner nodes are domain-separated (0x00 / 0x01 prefixes), and
+an odd node at the end of a level is promoted unchanged instead of
+being paired with itself.
+"""
+
+import hashlib
+from typing import List
+
+from core.canonical import encode_alert, iter_encoded_alerts
+
+EMPTY_ROOT = hashlib.sha256(b'').hexdigest()
+
+
+def leaf_hash(alert: dict) -> bytes:
+    """Hash a single alert using the same canonical JSON as block hashing."""
+    return _leaf_from_encoded(encode_alert(alert))
+
+
+def _leaf_from_encoded(encoded: str) -> bytes:
+    return hashlib.sha256(b'\x00' + encoded.encode()).digest()
+
+
+def _leaves(alerts) -> List[bytes]:
+    return [_leaf_from_encoded(e) for e in iter_encoded_alerts(alerts)]
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    paired = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        paired.append(level[-1])
+    return paired
+
+
+def merkle_root(alerts: List[dict]) -> str:
+    """Hex Merkle root of a list of alerts (EMPTY_ROOT for no alerts)."""
+    if not alerts:
+        return EMPTY_ROOT
+    level = _leaves(alerts)
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_proof(alerts: List[dict], position: int) -> List[dict]:
+    """
+    Sibling path proving that alerts[position] is committed to by the root.
+
+    Returns:
+        List of {"hash": hex, "side": "left"|"right"} from leaf to root
+    """
+    if not 0 <= position < len(alerts):
+        raise IndexError("alert position out of range")
+
+    level = _leaves(alerts)
+    proof = []
+    while len(level) > 1:
+        sibling = position ^ 1
+        if sibling < len(level):
+            proof.append({"hash": level[sibling].hex(), "side": "left" if sibling < position else "right"})
+        level = _next_level(level)
+        position //= 2
+    return proof
+
+
+def verify_proof(alert: dict, proof: List[dict], root: str) -> bool:
+    """Recompute the root from one alert and its sibling path."""
+    current = leaf_hash(alert)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        current = _node_hash(sibling, current) if step["side"] == "left" else _node_hash(current, sibling)
+    return current.hex() == root
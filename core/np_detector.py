@@ -0,0 +1,154 @@
+"""
+Sentinel Mesh - Torch-free NumPy Inference Backend
+
+Runs the same 77->64->32->16->32->64->77 autoencoder as `core.detector`
+with plain NumPy matmuls, so a node can score traffic without importing
+torch. The weights are exported once from `autoencoder.pth` into a
+compact `.npz` artifact; only the export step needs torch.
+
+Usage:
+    python -m core.np_detector            # check the committed .npz against torch
+    python -m core.np_detector --export   # re-export .npz from .pth, then check
+"""
+
+import os
+
+import numpy as np
+
+# Katman sırası: Autoencoder.encoder/decoder içindeki Linear katmanları
+LAYER_KEYS = [
+    "encoder.0", "encoder.2", "encoder.4",
+    "decoder.0", "decoder.2", "decoder.4",
+]
+
+
+def export_weights(model_path, npz_path):
+    """
+    Convert a torch state_dict into a `.npz` file of transposed float32 weights.
+
+    This is the only function in this module that imports torch.
+    """
+    import torch
+
+    state = torch.load(model_path, map_location="cpu")
+    arrays = {}
+    for i, key in enumerate(LAYER_KEYS):
+        # (out, in) -> (in, out) so the forward pass is a plain x @ W
+        arrays[f"w{i}"] = np.ascontiguousarray(state[f"{key}.weight"].numpy().T, dtype=np.float32)
+        arrays[f"b{i}"] = state[f"{key}.bias"].numpy().astype(np.float32)
+    np.savez(npz_path, **arrays)
+    return npz_path
+
+
+def _sigmoid(x):
+    # Taşma (overflow) uyarısı vermeyen sayısal olarak kararlı sigmoid
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+class NumpyDetector:
+    """
+    Drop-in replacement for `SentinelDetector` backed by NumPy.
+
+    Attributes:
+        weights: List of (W, b) pairs, W stored as (in_features, out_features)
+        threshold: MSE above which a row is flagged as an anomaly
+    """
+
+    def __init__(self, weights_path, threshold_path, input_dim, model_path=None):
+        try:
+            if not os.path.exists(weights_path):
+                if model_path is None:
+                    raise FileNotFoundError(weights_path)
+                # İlk çalıştırmada .pth dosyasından tek seferlik dönüşüm
+                export_weights(model_path, weights_path)
+
+            with np.load(weights_path) as data:
+                self.weights = [(data[f"w{i}"], data[f"b{i}"]) for i in range(len(LAYER_KEYS))]
+            if self.weights[0][0].shape[0] != input_dim:
+                raise ValueError(f"Expected input_dim {input_dim}, got {self.weights[0][0].shape[0]}")
+
+            self.threshold = np.load(threshold_path)[0]
+            print(f"✅ NumPy AI Model loaded with threshold: {self.threshold:.6f}")
+        except Exception as e:
+            print(f"❌ Critical Error loading model: {e}")
+            raise
+
+    def forward(self, batch):
+        """Reconstruct a (N, input_dim) float32 batch."""
+        x = batch
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(self.weights):
+            x = x @ w
+            x += b
+            x = _sigmoid(x) if i == last else np.tanh(x, out=x)
+        return x
+
+    def predict(self, sample):
+        """Tek bir veri satırı üzerinde anomali tespiti yapar."""
+        flags, mses = self.predict_batch(np.asarray(sample).reshape(1, -1))
+        return bool(flags[0]), float(mses[0])
+
+    def predict_batch(self, samples):
+        """
+        Score many rows with a single vectorized forward pass.
+
+        Args:
+            samples: Array-like of shape (N, input_dim)
+
+        Returns:
+            Tuple of (is_anomaly, mse) NumPy arrays, both of shape (N,)
+        """
+        batch = np.asarray(samples, dtype=np.float32)
+        if batch.ndim == 1:
+            batch = batch.reshape(1, -1)
+
+        reconstructed = self.forward(batch)
+        mse = np.mean((reconstructed - batch) ** 2, axis=1)
+        return mse > self.threshold, mse
+
+
+def check_parity(model_path, weights_path, threshold_path, input_dim=77,
+                 n_samples=1024, atol=1e-6, seed=0):
+    """
+    Compare NumPy and torch reconstruction errors on rows spread around the
+    decision threshold (uniform random rows all score far above it, so they
+    would not exercise any decision).
+
+    Returns:
+        Tuple of (max_abs_mse_diff, decision_mismatches); raises AssertionError
+        if the MSE difference exceeds `atol`, any anomaly decision differs or
+        the rows don't fall on both sides of the threshold.
+    """
+    from core.detector import SentinelDetector
+
+    torch_detector = SentinelDetector(model_path, threshold_path, input_dim)
+    samples = torch_detector._calibration_batch(n_samples, seed=seed)
+
+    torch_flags, torch_mse = torch_detector.predict_batch(samples)
+    np_flags, np_mse = NumpyDetector(weights_path, threshold_path, input_dim).predict_batch(samples)
+
+    max_diff = float(np.max(np.abs(torch_mse - np_mse)))
+    mismatches = int(np.sum(torch_flags != np_flags))
+    assert max_diff <= atol, f"MSE drift {max_diff:.3e} exceeds tolerance {atol:.0e}"
+    assert mismatches == 0, f"{mismatches} anomaly decisions differ from torch"
+    assert 0 < torch_flags.sum() < len(samples), "parity rows don't straddle the threshold"
+    return max_diff, mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+
+    MODEL = "models/saved_models/autoencoder.pth"
+    WEIGHTS = "models/saved_models/autoencoder.npz"
+    THRESHOLD = "models/saved_models/ae_threshold.npy"
+
+    parser = argparse.ArgumentParser(description="NumPy backend weight export / parity check")
+    parser.add_argument('--export', action='store_true', help='Re-export the .npz from the .pth before checking')
+    args = parser.parse_args()
+
+    # Varsayılan: depodaki .npz olduğu gibi kontrol edilir (yeniden üretmek eski dosyayı gizlerdi)
+    if args.export:
+        export_weights(MODEL, WEIGHTS)
+        print(f"📦 Exported {WEIGHTS}")
+    diff, _ = check_parity(MODEL, WEIGHTS, THRESHOLD)
+    print(f"✅ {WEIGHTS} parity OK (max MSE diff {diff:.3e})")
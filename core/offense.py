@@ -0,0 +1,108 @@
+"""
+Sentinel Mesh - Per-Source Offense Tracking
+
+Bounded-memory state kept per traffic source by the contract engine:
+
+    SlidingWindowCounter - offenses per source over the last `window` seconds
+    CooldownTracker      - per (contract, source) cooldown deadlines
+
+Both are LRU-bounded: when `capacity` sources are tracked, the least
+recently seen one is forgotten, so millions of distinct source IPs
+never grow memory past a fixed limit. The window is split into
+`buckets` sub-intervals, so counts slide with bucket granularity.
+"""
+
+from collections import OrderedDict
+from typing import Hashable
+
+
+class SlidingWindowCounter:
+    """
+    Exact per-source counts over a sliding time window, for at most `capacity` sources.
+
+    Attributes:
+        window: Window length in seconds
+        buckets: Number of sub-intervals the window is divided into
+        capacity: Maximum number of tracked sources (LRU eviction)
+    """
+
+    def __init__(self, window: float = 300.0, buckets: int = 10, capacity: int = 65536):
+        self.window = window
+        self.buckets = buckets
+        self.capacity = capacity
+        self.bucket_width = window / buckets
+        # kaynak -> [son kova numarası, kova_0 .. kova_{b-1}] (halka)
+        self._states: OrderedDict = OrderedDict()
+        self.evicted = 0
+
+    def _advance(self, state, epoch):
+        last = state[0]
+        if epoch - last >= self.buckets:
+            for i in range(1, self.buckets + 1):
+                state[i] = 0
+        else:
+            for e in range(last + 1, epoch + 1):
+                state[1 + e % self.buckets] = 0
+        state[0] = epoch
+
+    def hit(self, source: Hashable, now: float, amount: int = 1) -> int:
+        """Record `amount` offenses for `source`; returns its count within the window."""
+        epoch = int(now // self.bucket_width)
+        state = self._states.get(source)
+        if state is None:
+            state = [epoch] + [0] * self.buckets
+            self._states[source] = state
+            if len(self._states) > self.capacity:
+                self._states.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._states.move_to_end(source)
+            if epoch > state[0]:
+                self._advance(state, epoch)
+        state[1 + epoch % self.buckets] += amount
+        return sum(state[1:])
+
+    def count(self, source: Hashable, now: float) -> int:
+        state = self._states.get(source)
+        if state is None:
+            return 0
+        epoch = int(now // self.bucket_width)
+        if epoch > state[0]:
+            self._advance(state, epoch)
+        return sum(state[1:])
+
+    def __len__(self):
+        return len(self._states)
+
+
+class CooldownTracker:
+    """
+    Cooldown deadlines per key, e.g. (contract name, source), for at most `capacity` keys.
+
+    Evicting a key only ends its cooldown early; the oldest keys are evicted
+    first and are the ones most likely to have expired already.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        self.capacity = capacity
+        self._until: OrderedDict = OrderedDict()
+
+    def ready(self, key: Hashable, now: float) -> bool:
+        until = self._until.get(key)
+        if until is None:
+            return True
+        if until <= now:
+            del self._until[key]
+            return True
+        return False
+
+    def start(self, key: Hashable, cooldown: float, now: float):
+        if cooldown <= 0:
+            return
+        self._until[key] = now + cooldown
+        self._until.move_to_end(key)
+        if len(self._until) > self.capacity:
+            self._until.popitem(last=False)
+
+    def __len__(self):
+        return len(self._until)
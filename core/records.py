@@ -0,0 +1,290 @@
+"""
+Sentinel Mesh - Compact Block and Alert Records
+
+At millions of alerts, one Python dict per alert (plus a float object
+for each of its confidence and timestamp) dominates node memory. Here a
+block is a `__slots__` object and its alerts are stored column-wise:
+
+    confidence, timestamp  -> array('d')
+    sender, type           -> array('I') of ids into an interned string table
+    count (optional)       -> array('I'), only for blocks with coalesced alerts
+
+Both types behave like the old dicts for reading (`block['hash']`,
+`block['alerts'][i]['sender']`, `block.get(...)`, `block.items()`), so
+hashing, validation and indexing code is unchanged and existing chains
+keep exactly the same canonical hash encoding. Conversion to plain
+dicts only happens at the API edge (`to_dict`).
+
+Usage:
+    python -m core.records        # memory benchmark, dict vs compact
+"""
+
+import threading
+from array import array
+
+ALERT_FIELDS = ('confidence', 'sender', 'timestamp', 'type')
+MAX_COUNT = 2 ** 32 - 1
+BLOCK_FIELDS = ('index', 'timestamp', 'alerts', 'merkle_root', 'previous_hash', 'sender', 'hash')
+
+
+class StringTable:
+    """
+    Interns sender ids and alert types into small integer ids.
+
+    Lookups of already interned strings are lock-free; adding a new string
+    is serialized so concurrent callers can never hand out the same id.
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+        self._lock = threading.Lock()
+
+    def intern(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            with self._lock:
+                string_id = self.ids.get(value)
+                if string_id is None:
+                    # Önce listeye ekle: id yayımlandığında dize okunabilir olmalı
+                    self.strings.append(value)
+                    string_id = self.ids[value] = len(self.strings) - 1
+        return string_id
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+
+STRINGS = StringTable()
+
+
+class AlertColumns:
+    """
+    Column-oriented alert list; indexing/iteration yields plain alert dicts.
+
+    Only alerts matching the fixed schema (float confidence/timestamp,
+    str sender/type, optionally an int 'count' from mempool coalescing,
+    no other keys) can be stored; `from_dicts` returns None otherwise so
+    the caller can keep the original list and its exact JSON encoding.
+    The count column is None until an alert carries a count; 0 marks
+    alerts without one.
+    """
+
+    __slots__ = ('confidence', 'timestamp', 'sender_id', 'type_id', 'count')
+
+    def __init__(self):
+        self.confidence = array('d')
+        self.timestamp = array('d')
+        self.sender_id = array('I')
+        self.type_id = array('I')
+        self.count = None
+
+    @classmethod
+    def from_dicts(cls, alerts):
+        columns = cls()
+        for position, alert in enumerate(alerts):
+            count = alert.get('count') if len(alert) == 5 else None
+            if len(alert) == 5 and (type(count) is not int or not 0 < count <= MAX_COUNT):
+                return None
+            if (len(alert) not in (4, 5) or type(alert.get('confidence')) is not float
+                    or type(alert.get('timestamp')) is not float
+                    or type(alert.get('sender')) is not str or type(alert.get('type')) is not str):
+                return None
+            columns.confidence.append(alert['confidence'])
+            columns.timestamp.append(alert['timestamp'])
+            columns.sender_id.append(STRINGS.intern(alert['sender']))
+            columns.type_id.append(STRINGS.intern(alert['type']))
+            if count is not None and columns.count is None:
+                columns.count = array('I', [0]) * position
+            if columns.count is not None:
+                columns.count.append(count or 0)
+        return columns
+
+    def __len__(self):
+        return len(self.confidence)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        # Anahtarlar kanonik (sıralı) düzende: json.dumps(sort_keys=True) ile aynı
+        alert = {'confidence': self.confidence[position]}
+        count = self.count[position] if self.count is not None else 0
+        if count:
+            alert['count'] = count
+        alert['sender'] = STRINGS[self.sender_id[position]]
+        alert['timestamp'] = self.timestamp[position]
+        alert['type'] = STRINGS[self.type_id[position]]
+        return alert
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def to_list(self):
+        return [self[i] for i in range(len(self))]
+
+    def __reduce__(self):
+        # Dize id'leri süreç-yerel STRINGS tablosuna bağlı; pickle ederken kendi küçük tablosunu taşır
+        used = sorted(set(self.sender_id) | set(self.type_id))
+        remap = {string_id: i for i, string_id in enumerate(used)}
+        return (_rebuild_columns, (
+            self.confidence, self.timestamp,
+            array('I', (remap[i] for i in self.sender_id)),
+            array('I', (remap[i] for i in self.type_id)),
+            [STRINGS[i] for i in used],
+            self.count,
+        ))
+
+
+def _rebuild_columns(confidence, timestamp, sender_ids, type_ids, strings, count=None):
+    local = [STRINGS.intern(value) for value in strings]
+    columns = AlertColumns()
+    columns.confidence = confidence
+    columns.timestamp = timestamp
+    columns.sender_id = array('I', (local[i] for i in sender_ids))
+    columns.type_id = array('I', (local[i] for i in type_ids))
+    columns.count = count
+    return columns
+
+
+class Block:
+    """
+    Compact, read-mostly block record with dict-style access.
+
+    `merkle_root` is None for legacy blocks (hashed over their full
+    content); `extra` holds any non-standard keys a peer sent so their
+    encoding, and therefore their hash, is preserved. `verified_hash`
+    caches the hash once it has been checked against the content.
+    """
+
+    __slots__ = ('index', 'timestamp', 'alerts', 'merkle_root', 'previous_hash', 'sender', 'hash', 'extra',
+                 'verified_hash')
+
+    def __init__(self, index, timestamp, alerts, previous_hash, sender, merkle_root=None, hash=None, extra=None):
+        self.index = index
+        self.timestamp = timestamp
+        columns = alerts if isinstance(alerts, AlertColumns) else AlertColumns.from_dicts(alerts)
+        self.alerts = columns if columns is not None else list(alerts)
+        self.merkle_root = merkle_root
+        self.previous_hash = previous_hash
+        self.sender = sender
+        self.hash = hash
+        self.extra = extra
+        self.verified_hash = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Block from its JSON/dict form (Blocks are passed through)."""
+        if isinstance(data, Block):
+            return data
+        extra = {k: v for k, v in data.items() if k not in BLOCK_FIELDS} or None
+        return cls(
+            index=data['index'],
+            timestamp=data['timestamp'],
+            alerts=data['alerts'],
+            previous_hash=data['previous_hash'],
+            sender=data.get('sender'),
+            merkle_root=data.get('merkle_root'),
+            hash=data.get('hash'),
+            extra=extra,
+        )
+
+    def keys(self):
+        keys = ['index', 'timestamp', 'alerts']
+        if self.merkle_root is not None:
+            keys.append('merkle_root')
+        keys += ['previous_hash', 'sender']
+        if self.hash is not None:
+            keys.append('hash')
+        if self.extra:
+            keys += list(self.extra)
+        return keys
+
+    def __getitem__(self, key):
+        if key in BLOCK_FIELDS:
+            value = getattr(self, key)
+            if value is None and key in ('merkle_root', 'hash'):
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        """(key, value) pairs with alerts materialized as dicts, like the original block dict."""
+        return self.to_dict().items()
+
+    def to_dict(self):
+        data = {}
+        for key in self.keys():
+            value = self[key]
+            data[key] = value.to_list() if isinstance(value, AlertColumns) else value
+        return data
+
+
+def to_jsonable(obj):
+    """`json` default hook converting compact records at the API edge."""
+    if isinstance(obj, Block):
+        return obj.to_dict()
+    if isinstance(obj, AlertColumns):
+        return obj.to_list()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    import tracemalloc
+
+    N_BLOCKS, PER_BLOCK = 2000, 500
+    senders = [f"node-{i:03d}" for i in range(20)]
+
+    def make_alert(rng):
+        return {
+            'sender': rng.choice(senders),
+            'type': 'AI_ANOMALY_DETECTED',
+            'confidence': round(rng.random(), 4),
+            'timestamp': time.time(),
+        }
+
+    def build(compact):
+        rng = random.Random(0)
+        blocks = []
+        for i in range(N_BLOCKS):
+            block = {'index': i + 1, 'timestamp': time.time(), 'alerts': [make_alert(rng) for _ in range(PER_BLOCK)],
+                     'merkle_root': '0' * 64, 'previous_hash': '0' * 64, 'sender': 'bench', 'hash': '0' * 64}
+            blocks.append(Block.from_dict(block) if compact else block)
+        return blocks
+
+    n_alerts = N_BLOCKS * PER_BLOCK
+    results = {}
+    for label, compact in (("dict", False), ("compact", True)):
+        tracemalloc.start()
+        blocks = build(compact)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = current
+        print(f"{label:>8}: {current / 2**20:8.1f} MiB  ({current / n_alerts:6.1f} B/alert)")
+        del blocks
+    print(f"reduction: {results['dict'] / results['compact']:.1f}x for {n_alerts:,} alerts")
+
+    # Birleştirilmiş (count taşıyan) mempool çıktısı da sütunlu saklanmalı
+    from core.mempool import AlertMempool
+    pool = AlertMempool(coalesce_window=1.0)
+    pool.add_many('node-000', 'AI_ANOMALY_DETECTED', [0.5, 0.7, 0.9])
+    pool.add('node-001', 'AI_ANOMALY_DETECTED', 0.3)
+    mined = Block(1, time.time(), pool.take(), '0' * 64, 'bench')
+    assert isinstance(mined.alerts, AlertColumns), "coalesced alerts fell back to a list of dicts"
+    print(f"coalesced block: {len(mined.alerts)} alerts stored as AlertColumns")
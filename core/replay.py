@@ -0,0 +1,195 @@
+"""
+Sentinel Mesh - Streaming Traffic Replay Engine
+
+Streams a memory-mapped dataset through the detector in fixed-size
+chunks. A background thread reads the next chunks ahead of the one
+being scored, and an optional target rate (rows/s) paces the stream,
+so the whole test set can be replayed without loading it into RAM.
+
+Usage:
+    python -m core.replay --backend numpy --chunk-rows 4096 --rate 50000
+"""
+
+import queue
+import threading
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+
+_END = object()
+_PUT_TIMEOUT = 0.1
+
+
+class _ProducerError:
+    """Carries an exception from the prefetch thread to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ReplayEngine:
+    """
+    Replays a `DatasetReader` through any detector exposing `predict_batch`.
+
+    Attributes:
+        chunk_rows: Rows scored per forward pass
+        rate: Target rows per second (None = as fast as possible)
+        prefetch: Number of chunks read ahead of the one being scored
+    """
+
+    def __init__(self, reader, detector, chunk_rows: int = 4096,
+                 rate: Optional[float] = None, prefetch: int = 2):
+        self.reader = reader
+        self.detector = detector
+        self.chunk_rows = chunk_rows
+        self.rate = rate
+        self.prefetch = prefetch
+
+        self._stop = threading.Event()
+        self.running = False
+        self.rows = 0
+        self.anomalies = 0
+        self.chunks = 0
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self.error = None
+
+    def _prefetched_chunks(self, start, stop) -> Iterator:
+        """
+        Read chunks on a background thread, at most `prefetch` ahead of the consumer.
+
+        The producer gives up as soon as the consumer stops (stop(), generator
+        close or an exception), and read errors are re-raised in the consumer.
+        """
+        buffer: "queue.Queue" = queue.Queue(maxsize=max(1, self.prefetch))
+        abandoned = threading.Event()
+
+        def put(item) -> bool:
+            # Dolu kuyrukta sonsuza dek bloklanma: tüketici bıraktıysa üretici de çıkar
+            while not abandoned.is_set():
+                try:
+                    buffer.put(item, timeout=_PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    if self._stop.is_set():
+                        return False
+            return False
+
+        def producer():
+            try:
+                for item in self.reader.iter_chunks(self.chunk_rows, start, stop):
+                    if self._stop.is_set() or not put(item):
+                        return
+            except Exception as e:
+                put(_ProducerError(e))
+                return
+            put(_END)
+
+        threading.Thread(target=producer, name="replay-prefetch", daemon=True).start()
+        try:
+            while True:
+                try:
+                    item = buffer.get(timeout=_PUT_TIMEOUT)
+                except queue.Empty:
+                    if self._stop.is_set():
+                        return
+                    continue
+                if item is _END:
+                    return
+                if isinstance(item, _ProducerError):
+                    raise item.error
+                yield item
+        finally:
+            abandoned.set()
+
+    def run(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        """
+        Stream rows [start, stop) through the detector.
+
+        The engine is marked running as soon as this is called (not on the
+        first iteration), so callers can check-and-start under one lock.
+
+        Yields:
+            One dict per chunk with its offset, per-row flags and MSE
+        """
+        self._stop.clear()
+        self.running = True
+        self.error = None
+        self.rows = self.anomalies = self.chunks = 0
+        self.started_at = time.perf_counter()
+        return self._run(start, stop)
+
+    def _run(self, start, stop) -> Iterator[dict]:
+        try:
+            for offset, chunk in self._prefetched_chunks(start, stop):
+                if self._stop.is_set():
+                    break
+                flags, mse = self.detector.predict_batch(chunk)
+                self.rows += len(chunk)
+                self.anomalies += int(np.count_nonzero(flags))
+                self.chunks += 1
+                yield {"offset": offset, "rows": len(chunk), "flags": flags, "mse": mse}
+
+                if self.rate:
+                    # Hedef hıza göre bekle: şu ana kadarki satırlar / rate saniyede bitmeli
+                    ahead = self.rows / self.rate - (time.perf_counter() - self.started_at)
+                    if ahead > 0:
+                        self._stop.wait(ahead)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.finished_at = time.perf_counter()
+            self.running = False
+
+    def stop(self):
+        """Ask a running replay to stop after the current chunk."""
+        self._stop.set()
+
+    def get_stats(self) -> dict:
+        """Return rows, anomalies and sustained throughput of the current/last run."""
+        end = time.perf_counter() if self.running else self.finished_at
+        elapsed = max(end - self.started_at, 1e-9) if self.started_at else 0.0
+        return {
+            "running": self.running,
+            "dataset_rows": len(self.reader),
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "anomalies": self.anomalies,
+            "elapsed_s": round(elapsed, 4),
+            "rows_per_sec": round(self.rows / elapsed, 1) if elapsed else 0.0,
+            "chunk_rows": self.chunk_rows,
+            "target_rate": self.rate,
+            "prefetch": self.prefetch,
+            "error": self.error,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from utils.data_helper import DatasetReader
+
+    parser = argparse.ArgumentParser(description="Replay a dataset through the detector")
+    parser.add_argument('--path', default='data/processed/X_test_scaled.npy')
+    parser.add_argument('--backend', choices=['torch', 'numpy'], default='torch')
+    parser.add_argument('--chunk-rows', default=4096, type=int)
+    parser.add_argument('--rate', default=None, type=float, help='Target rows per second')
+    parser.add_argument('--prefetch', default=2, type=int)
+    args = parser.parse_args()
+
+    if args.backend == 'numpy':
+        from core.np_detector import NumpyDetector
+        detector = NumpyDetector('models/saved_models/autoencoder.npz',
+                                 'models/saved_models/ae_threshold.npy', 77,
+                                 model_path='models/saved_models/autoencoder.pth')
+    else:
+        from core.detector import SentinelDetector
+        detector = SentinelDetector('models/saved_models/autoencoder.pth',
+                                    'models/saved_models/ae_threshold.npy', 77)
+
+    engine = ReplayEngine(DatasetReader(args.path), detector, args.chunk_rows, args.rate, args.prefetch)
+    for _ in engine.run():
+        pass
+    print(engine.get_stats())
@@ -0,0 +1,149 @@
+"""
+Sentinel Mesh - Micro-Batching Inference Scheduler
+
+Concurrent /scan requests each carry a single traffic row. Running a
+separate forward pass per row wastes most of the time on per-call
+overhead, so this scheduler queues incoming samples and flushes them
+to the detector as one batch when either the batch is full or the
+oldest queued sample has waited for `max_wait_ms`.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class InferenceScheduler:
+    """
+    Coalesces single-sample predictions into batched detector calls.
+
+    Attributes:
+        detector: Any object exposing `predict_batch(samples)`
+        max_batch_size: Flush as soon as this many samples are queued
+        max_wait_ms: Upper bound on how long the first sample of a batch waits
+        n_features: If set, rows of any other length are rejected in `submit`
+    """
+
+    def __init__(self, detector, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 stats_window: int = 1024, n_features: Optional[int] = None):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.n_features = n_features
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+
+        # Statistics - wait times are kept in a bounded window for percentiles
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._wait_times_ms: deque = deque(maxlen=stats_window)
+        self._total_samples = 0
+        self._total_batches = 0
+        self._max_queue_depth = 0
+
+        self._worker = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, sample) -> Future:
+        """Queue a single row and return a Future resolving to (is_anomaly, mse)."""
+        row = np.asarray(sample, dtype=np.float32).reshape(-1)
+        # Hatalı satır kuyruğa girmez; aksi halde aynı partideki diğer isteklerin hepsi düşerdi
+        if self.n_features is not None and row.size != self.n_features:
+            raise ValueError(f"sample must have {self.n_features} features, got {row.size}")
+        future: Future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            if depth > self._max_queue_depth:
+                self._max_queue_depth = depth
+        return future
+
+    def predict(self, sample, timeout: float = 5.0) -> Tuple[bool, float]:
+        """Blocking drop-in replacement for `SentinelDetector.predict`."""
+        return self.submit(sample).result(timeout=timeout)
+
+    def stop(self):
+        """Stop the worker thread after the current batch."""
+        self._stop.set()
+        self._worker.join(timeout=1.0)
+
+    def _collect_batch(self):
+        """Block for the first sample, then gather more until full or the deadline passes."""
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first[2] + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    # Deadline reached: only drain what is already waiting
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            flushed_at = time.perf_counter()
+            try:
+                samples = np.stack([row for row, _, _ in batch])
+                flags, mses = self.detector.predict_batch(samples)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result((bool(flags[i]), float(mses[i])))
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._total_batches += 1
+                self._total_samples += len(batch)
+                self._wait_times_ms.extend((flushed_at - queued_at) * 1000.0 for _, _, queued_at in batch)
+
+    def get_stats(self) -> dict:
+        """Return queue depth, batch-size distribution and wait-time statistics."""
+        with self._stats_lock:
+            waits = np.fromiter(self._wait_times_ms, dtype=np.float64)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            total_batches = self._total_batches
+            total_samples = self._total_samples
+            max_queue_depth = self._max_queue_depth
+
+        wait_stats = {"count": int(waits.size)}
+        if waits.size:
+            wait_stats.update({
+                "mean_ms": round(float(waits.mean()), 4),
+                "p50_ms": round(float(np.percentile(waits, 50)), 4),
+                "p99_ms": round(float(np.percentile(waits, 99)), 4),
+                "max_ms": round(float(waits.max()), 4),
+            })
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": max_queue_depth,
+            "total_batches": total_batches,
+            "total_samples": total_samples,
+            "avg_batch_size": round(total_samples / total_batches, 2) if total_batches else 0.0,
+            "batch_size_distribution": batch_sizes,
+            "wait_time": wait_stats,
+        }
@@ -0,0 +1,271 @@
+"""
+Sentinel Mesh - Persistent Ledger Storage
+
+An append-only block log with a fixed-width offset index, so a node can
+restart without re-downloading its chain and without holding every
+block in memory.
+
+Files inside the data directory:
+    blocks.log  - one canonical JSON record per block, appended in order
+    blocks.idx  - 44 bytes per block: log offset (u64), length (u32), raw hash (32B)
+
+The index is a flat array of fixed-width records, memory-mapped with
+NumPy; a hash -> position dict is built from it on the first hash lookup
+and kept up to date on append/truncate. On startup only the tip block is
+read and re-hashed; a torn tail left by a crash is truncated away.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from core.records import Block, to_jsonable
+
+INDEX_DTYPE = np.dtype([('offset', '<u8'), ('length', '<u4'), ('hash', 'S32')])
+
+
+class BlockStore:
+    """
+    Append-only block log plus offset index.
+
+    Attributes:
+        directory: Where blocks.log and blocks.idx live
+        fsync_every: fsync after this many appended blocks...
+        fsync_interval: ...or once this many seconds passed since the last fsync
+    """
+
+    def __init__(self, directory, hash_fn, fsync_every: int = 32, fsync_interval: float = 1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.hash_fn = hash_fn
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self.log_path = os.path.join(directory, 'blocks.log')
+        self.idx_path = os.path.join(directory, 'blocks.idx')
+        for path in (self.log_path, self.idx_path):
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+
+        self._recover()
+
+        self._log = open(self.log_path, 'ab')
+        self._idx = open(self.idx_path, 'ab')
+        self._read_fd = os.open(self.log_path, os.O_RDONLY)
+        self._idx_fd = os.open(self.idx_path, os.O_RDONLY)
+        self._index_map = None
+        self._positions = None  # ham hash (32B) -> 0 tabanlı konum; ilk aramada kurulur
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # --- Açılış / kurtarma ---
+
+    def _recover(self):
+        """
+        Drop partially written index records and any log bytes past the last
+        indexed block, then verify the tip block against its stored hash.
+        """
+        idx_size = os.path.getsize(self.idx_path)
+        count = idx_size // INDEX_DTYPE.itemsize
+        log_size = os.path.getsize(self.log_path)
+
+        with open(self.idx_path, 'rb') as idx, open(self.log_path, 'rb') as log:
+            while count > 0:
+                idx.seek((count - 1) * INDEX_DTYPE.itemsize)
+                entry = np.frombuffer(idx.read(INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)[0]
+                end = int(entry['offset']) + int(entry['length'])
+                if end <= log_size:
+                    log.seek(int(entry['offset']))
+                    try:
+                        block = json.loads(log.read(int(entry['length'])))
+                        stored_hash = bytes(entry['hash']).hex()
+                        if block.get('hash') == stored_hash == self.hash_fn(block):
+                            break
+                    except ValueError:
+                        pass
+                # Çökme sırasında yarım kalmış uç blok: at ve bir öncekini dene
+                print(f"⚠️ Ledger tip #{count} failed verification, truncating")
+                count -= 1
+            else:
+                end = 0
+
+        self._count = count
+        os.truncate(self.idx_path, count * INDEX_DTYPE.itemsize)
+        os.truncate(self.log_path, end if count else 0)
+
+    # --- Okuma ---
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, position):
+        raw = os.pread(self._idx_fd, INDEX_DTYPE.itemsize, position * INDEX_DTYPE.itemsize)
+        return np.frombuffer(raw, dtype=INDEX_DTYPE)[0]
+
+    def read(self, position):
+        """Read the block at 0-based `position` from disk."""
+        entry = self._entry(position)
+        return json.loads(os.pread(self._read_fd, int(entry['length']), int(entry['offset'])))
+
+    def index_map(self):
+        """Memory-mapped view of the whole index (re-mapped only when it grew)."""
+        if self._count == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        if self._index_map is None or len(self._index_map) != self._count:
+            self._index_map = np.memmap(self.idx_path, dtype=INDEX_DTYPE, mode='r', shape=(self._count,))
+        return self._index_map
+
+    def find_hash(self, block_hash):
+        """0-based position of the block with this hash, or -1 (O(1) after the first call)."""
+        try:
+            raw = bytes.fromhex(block_hash)
+        except (TypeError, ValueError):
+            return -1
+        if self._positions is None:
+            positions = {}
+            # 'S32' sondaki sıfır baytları kırpar; anahtarlar tam 32 bayta tamamlanır
+            for position, stored in enumerate(self.index_map()['hash'].tolist()):
+                positions.setdefault(stored.ljust(32, b'\0'), position)
+            self._positions = positions
+        return self._positions.get(raw, -1)
+
+    # --- Yazma ---
+
+    def append(self, block):
+        record = json.dumps(block, separators=(',', ':'), default=to_jsonable).encode()
+        offset = self._log.tell()
+        self._log.write(record)
+        raw_hash = bytes.fromhex(block['hash'])
+        entry = np.array([(offset, len(record), raw_hash)], dtype=INDEX_DTYPE)
+        self._idx.write(entry.tobytes())
+        if self._positions is not None:
+            self._positions.setdefault(raw_hash, self._count)
+        # İşletim sistemine yaz (okunabilir olsun); fsync toplu yapılır
+        self._log.flush()
+        self._idx.flush()
+        self._count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def truncate(self, length):
+        """Drop every block from 0-based position `length` onward (fork resolution)."""
+        if length >= self._count:
+            return
+        end = int(self._entry(length)['offset'])
+        if self._positions is not None:
+            for stored in self.index_map()['hash'][length:].tolist():
+                stored = stored.ljust(32, b'\0')
+                if self._positions.get(stored, -1) >= length:
+                    del self._positions[stored]
+        self._index_map = None
+        self._log.flush()
+        self._idx.flush()
+        os.truncate(self.log_path, end)
+        os.truncate(self.idx_path, length * INDEX_DTYPE.itemsize)
+        # O_APPEND yazımlar yeni sona gider ama tell() eski konumu gösterir; hizala
+        self._log.seek(0, os.SEEK_END)
+        self._idx.seek(0, os.SEEK_END)
+        self._count = length
+        self.sync()
+
+    def sync(self):
+        """fsync both files; called in batches from append and on close."""
+        self._log.flush()
+        self._idx.flush()
+        os.fsync(self._log.fileno())
+        os.fsync(self._idx.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        self.sync()
+        self._index_map = None
+        self._log.close()
+        self._idx.close()
+        os.close(self._read_fd)
+        os.close(self._idx_fd)
+
+
+class PersistentChain:
+    """
+    List-like view over a `BlockStore` used as `Blockchain.chain`.
+    Blocks are decoded into compact `core.records.Block` objects on read.
+
+    Supports len(), indexing (incl. negative and slices), iteration,
+    append/extend and `del chain[k:]`. Recently read blocks are kept in
+    a small LRU cache; everything else stays on disk until it is read.
+    Reads and writes are serialized per block, so concurrent readers never
+    see a half-truncated log.
+    """
+
+    def __init__(self, store: BlockStore, cache_size: int = 1024):
+        self.store = store
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        with self._lock:
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError("chain index out of range")
+            block = self._cache.get(item)
+            if block is None:
+                block = Block.from_dict(self.store.read(item))
+                self._remember(item, block)
+            else:
+                self._cache.move_to_end(item)
+            return block
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def scan(self, start, stop):
+        """Sequential read of [start, stop) that bypasses (and doesn't evict) the LRU cache."""
+        for position in range(start, min(stop, len(self))):
+            with self._lock:
+                if position >= len(self):
+                    return  # tarama sırasında zincir kısaldı (çatal benimseme)
+                block = self._cache.get(position)
+                if block is None:
+                    block = Block.from_dict(self.store.read(position))
+            yield block
+
+    def __delitem__(self, item):
+        if not isinstance(item, slice) or item.stop is not None or item.step not in (None, 1):
+            raise TypeError("only 'del chain[k:]' is supported on an append-only ledger")
+        start = item.start or 0
+        with self._lock:
+            self.store.truncate(start)
+            for position in [p for p in self._cache if p >= start]:
+                del self._cache[position]
+
+    def _remember(self, position, block):
+        self._cache[position] = block
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def append(self, block):
+        with self._lock:
+            self.store.append(block)
+            self._remember(len(self.store) - 1, block)
+
+    def extend(self, blocks):
+        for block in blocks:
+            self.append(block)
+
+    def index_of_hash(self, block_hash):
+        with self._lock:
+            return self.store.find_hash(block_hash)
@@ -1,8 +1,14 @@
+import os
+import threading
 import streamlit as st
 import requests
 import pandas as pd
 import time
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 
 # SAYFA AYARLARI
 st.set_page_config(
@@ -12,8 +18,137 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# İzlenecek Düğümler
-NODES = ["http://localhost:5000", "http://localhost:5001","http://localhost:5002"]
+# İzlenecek Düğümler: SENTINEL_NODES (virgülle ayrılmış) veya kenar çubuğundan düzenlenebilir
+DEFAULT_NODES = ["http://localhost:5000", "http://localhost:5001","http://localhost:5002"]
+
+# Ağ ayarları: istek başına zaman aşımı, tüm düğümler için toplam süre ve önbellek ömrü
+REQUEST_TIMEOUT = 1.0
+FETCH_DEADLINE = 1.5
+CACHE_TTL = 1.0
+CHAIN_PAGE = 500
+
+def parse_nodes(text):
+    nodes = []
+    for item in text.replace('\n', ',').split(','):
+        item = item.strip().rstrip('/')
+        if item:
+            nodes.append(item if item.startswith('http') else f"http://{item}")
+    return list(dict.fromkeys(nodes))
+
+NODES = parse_nodes(os.environ.get('SENTINEL_NODES', '')) or DEFAULT_NODES
+
+#VERİ ÇEKME FONKSİYONU
+# Tüm düğümler ortak bir bağlantı havuzuyla eşzamanlı sorgulanır; toplam süre FETCH_DEADLINE ile sınırlı.
+# Her düğümün zinciri yerel olarak tutulur ve yalnızca yeni bloklar indirilir.
+class NodeFetcher:
+    """Shared (cross-rerun) node poller with a TTL snapshot cache and incremental chain copies."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="dashboard")
+        self.lock = threading.Lock()
+        self.chains = {}     # url -> {"blocks": [...], "tip": hash}
+        self.snapshots = {}  # düğüm listesi -> (zaman, veri)
+
+    def _get(self, url, path, **params):
+        return self.session.get(f"{url}{path}", params=params or None, timeout=REQUEST_TIMEOUT).json()
+
+    def _sync_chain(self, url, tip):
+        """Extend the local copy of `url`'s chain with only the blocks it doesn't have yet."""
+        with self.lock:
+            local = self.chains.setdefault(url, {"blocks": [], "tip": None})
+            blocks, local_tip = local["blocks"], local["tip"]
+        length, tip_hash = tip.get('length', 0), tip.get('hash')
+        if local_tip == tip_hash and len(blocks) == length:
+            return blocks
+
+        start = len(blocks)
+        # Zincir kısaldıysa veya aynı boyda farklı uca geçtiyse (çatal) baştan indir
+        if start > length or (start == length and local_tip != tip_hash):
+            start = 0
+        new_blocks = []
+        while start + len(new_blocks) < length:
+            page = self._get(url, '/chain/blocks', **{'from': start + len(new_blocks) + 1, 'limit': CHAIN_PAGE})
+            page = page.get('blocks', [])
+            if not page:
+                break
+            if not new_blocks and start and page[0].get('previous_hash') != blocks[start - 1]['hash']:
+                start = 0  # yerel kopyanın ucu artık düğümün zincirinde değil
+                continue
+            new_blocks.extend(page)
+
+        blocks = blocks[:start] + new_blocks
+        with self.lock:
+            self.chains[url] = {"blocks": blocks, "tip": blocks[-1]['hash'] if blocks else None}
+        return blocks
+
+    def fetch_node(self, url):
+        status = self._get(url, '/status')
+        tip = self._get(url, '/chain/tip')
+        try:
+            contract_status = self._get(url, '/contracts').get('status', {})
+        except Exception:
+            contract_status = {}
+        blocks = self._sync_chain(url, tip)
+        return {
+            "URL": url,
+            "ID": status.get('id', 'Unknown'),
+            "Reputation": status.get('reputation', 0),
+            "Pending Alerts": status.get('pending_alerts', 0),
+            "Peer Count": status.get('peer_count', 0),
+            "Chain Length": tip.get('length', len(blocks)),
+            "Blocks": blocks,
+            "Status": "Active",
+            "Color": "green",
+            "Contracts": contract_status
+        }
+
+    @staticmethod
+    def offline(url, status="Offline"):
+        return {
+            "URL": url,
+            "ID": "-",
+            "Reputation": 0,
+            "Pending Alerts": 0,
+            "Peer Count": 0,
+            "Chain Length": 0,
+            "Blocks": [],
+            "Status": status,
+            "Color": "red",
+            "Contracts": {}
+        }
+
+    def get_network_data(self, nodes):
+        key = tuple(nodes)
+        now = time.monotonic()
+        with self.lock:
+            cached = self.snapshots.get(key)
+        if cached and now - cached[0] < CACHE_TTL:
+            return cached[1]
+
+        futures = {url: self.executor.submit(self.fetch_node, url) for url in nodes}
+        done, _ = wait(list(futures.values()), timeout=FETCH_DEADLINE)
+        all_info = []
+        for url, future in futures.items():
+            if future not in done:
+                all_info.append(self.offline(url, "Timeout"))
+            elif future.exception() is not None:
+                all_info.append(self.offline(url))
+            else:
+                all_info.append(future.result())
+
+        with self.lock:
+            self.snapshots[key] = (time.monotonic(), all_info)
+        return all_info
+
+@st.cache_resource
+def get_fetcher():
+    return NodeFetcher()
+
+fetcher = get_fetcher()
 
 # BAŞLIK VE STİL
 st.title("🛡️ Sentinel Mesh: AI-Driven Decentralized Security")
@@ -22,6 +157,9 @@ st.markdown("---")
 
 # KOMUTA PANELİ (SIDEBAR) 
 st.sidebar.header("🕹️ Node Control Operations")
+with st.sidebar.expander("🌐 Watched Nodes"):
+    nodes_text = st.text_area("One URL or host:port per line", value="\n".join(NODES), height=120)
+NODES = parse_nodes(nodes_text) or NODES
 target_node = st.sidebar.selectbox("Select Target Node", NODES)
 
 st.sidebar.subheader("Action Menu")
@@ -30,7 +168,7 @@ col_s1, col_s2 = st.sidebar.columns(2)
 # 1. AI Tarama Butonu 
 if col_s1.button("🔍 Run AI Scan"):
     try:
-        res = requests.get(f"{target_node}/scan", timeout=2)
+        res = fetcher.session.get(f"{target_node}/scan", timeout=2)
         data = res.json()
         if "ANOMALY" in data.get("result", ""):
             st.sidebar.error(f"🚨 {data['result']}")
@@ -42,7 +180,7 @@ if col_s1.button("🔍 Run AI Scan"):
 # 2. Mining Butonu
 if col_s2.button("⚒️ Mine Block"):
     try:
-        res = requests.get(f"{target_node}/mine", timeout=2)
+        res = fetcher.session.get(f"{target_node}/mine", timeout=2)
         if res.status_code == 200:
             st.sidebar.success("Block Successfully Mined! 🧱")
             st.balloons()
@@ -59,7 +197,7 @@ st.sidebar.subheader("Debug Tools")
 # 3. İtibar Boost (Sunumda Hızlandırmak İçin Gerekli Olabilir)
 if st.sidebar.button("🚀 Boost Reputation (+10)"):
     try:
-        requests.get(f"{target_node}/reputation/boost", timeout=2)
+        fetcher.session.get(f"{target_node}/reputation/boost", timeout=2)
         st.sidebar.info("Reputation Boosted! 📈")
     except:
         st.sidebar.error("Connection Failed")
@@ -67,47 +205,8 @@ if st.sidebar.button("🚀 Boost Reputation (+10)"):
 # Otomatik Yenileme
 auto_refresh = st.sidebar.checkbox("Auto Refresh Data (2s)", value=True)
 
-#VERİ ÇEKME FONKSİYONU 
 def get_network_data():
-    all_info = []
-    for url in NODES:
-        try:
-            status = requests.get(f"{url}/status", timeout=1).json()
-            chain_resp = requests.get(f"{url}/chain", timeout=1).json()
-            
-            # Get contract data
-            try:
-                contracts_resp = requests.get(f"{url}/contracts", timeout=1).json()
-                contract_status = contracts_resp.get('status', {})
-            except Exception:
-                contract_status = {}
-            
-            all_info.append({
-                "URL": url,
-                "ID": status.get('id', 'Unknown'),
-                "Reputation": status.get('reputation', 0),
-                "Pending Alerts": status.get('pending_alerts', 0),
-                "Peer Count": status.get('peer_count', 0),
-                "Chain Length": chain_resp.get('length', 0),
-                "Blocks": chain_resp.get('chain', []),
-                "Status": "Active",
-                "Color": "green",
-                "Contracts": contract_status
-            })
-        except Exception:
-            all_info.append({
-                "URL": url, 
-                "ID": "-", 
-                "Reputation": 0, 
-                "Pending Alerts": 0,
-                "Peer Count": 0,
-                "Chain Length": 0, 
-                "Blocks": [],
-                "Status": "Offline",
-                "Color": "red",
-                "Contracts": {}
-            })
-    return all_info
+    return fetcher.get_network_data(NODES)
 
 network_data = get_network_data()
 
@@ -136,7 +235,7 @@ with col_contracts:
     if active_node_data and active_node_data.get('Contracts'):
         contracts = active_node_data['Contracts']
         st.metric("Enabled Contracts", contracts.get('enabled_contracts', 0))
-        st.metric("Blocked IPs", len(contracts.get('blocked_ips', [])))
+        st.metric("Blocked IPs", contracts.get('blocked_count', 0))
         st.metric("Actions Executed", contracts.get('total_actions_executed', 0))
     else:
         st.info("Contract data unavailable")
@@ -175,25 +274,135 @@ with col_chart:
         st.plotly_chart(fig, use_container_width=True)
 
 # 3. Blokzinciri Defteri
+# Yalnızca görünen sayfa çizilir; arama düğüm tarafındaki indeksli sorgulara gider
+EXPLORER_PAGE_SIZES = [10, 25, 50, 100]
+ACTIVITY_BUCKETS = 60
+BUCKET_STEPS = ["1s", "10s", "1min", "5min", "15min", "1h", "6h", "1D", "7D"]
+TIME_WINDOWS = {"All time": None, "Last 15 min": 900, "Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 604800}
+
+def block_rows(blocks):
+    return pd.DataFrame([{
+        "Block": b['index'],
+        "Time": pd.to_datetime(b['timestamp'], unit='s'),
+        "Validator": b.get('sender', 'Unknown'),
+        "Alerts": len(b['alerts']),
+        "Hash": b['hash']
+    } for b in blocks])
+
+def alert_rows(alerts):
+    df = pd.DataFrame(alerts)
+    if not df.empty and 'timestamp' in df:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+    return df
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def alert_activity(url, tip_hash, _blocks):
+    """Alert count and confidence per time bucket; recomputed only when the node's tip changes."""
+    rows = [(a['timestamp'], a['confidence'], a.get('count', 1)) for b in _blocks for a in b['alerts']]
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows, columns=["timestamp", "confidence", "count"])
+    df['time'] = pd.to_datetime(df['timestamp'], unit='s')
+    # Toplam süreyi ~ACTIVITY_BUCKETS aralığa bölen en küçük adım
+    span = df['time'].max() - df['time'].min()
+    step = next((s for s in BUCKET_STEPS if span / pd.Timedelta(s) <= ACTIVITY_BUCKETS), BUCKET_STEPS[-1])
+    return df.set_index('time').resample(step).agg(
+        alerts=('count', 'sum'), avg_confidence=('confidence', 'mean'), max_confidence=('confidence', 'max')
+    ).reset_index()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def search_alerts(url, params):
+    return fetcher.session.get(f"{url}/ledger/alerts", params=dict(params), timeout=REQUEST_TIMEOUT).json()
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def find_block(url, block_hash):
+    res = fetcher.session.get(f"{url}/ledger/block/{block_hash}", timeout=REQUEST_TIMEOUT)
+    return res.json() if res.status_code == 200 else None
+
 st.subheader("🔗 Distributed Ledger Explorer")
-cols = st.columns(len(network_data))
-
-for i, node in enumerate(network_data):
-    with cols[i]:
-        status_icon = "🟢" if node['Status'] == "Active" else "🔴"
-        st.markdown(f"### {status_icon} Node {5000+i}")
-        st.caption(f"Addr: {node['URL']} | Peers: {node['Peer Count']}")
-        
-        if node['Blocks']:
-            for block in reversed(node['Blocks']):
-                with st.expander(f"📦 Block #{block['index']} ({len(block['alerts'])} alerts)"):
-                    st.code(f"Hash: {block['hash']}", language="text")
-                    st.write("**Timestamp:**", block['timestamp'])
-                    st.write("**Validator:**", block.get('sender', 'Unknown'))
-                    st.json(block['alerts'])
+active_data = [n for n in network_data if n['Status'] == "Active"]
+
+if not active_data:
+    st.warning("No active nodes to explore")
+else:
+    tallest = max(range(len(active_data)), key=lambda i: active_data[i]['Chain Length'])
+    explorer_url = st.selectbox("Node", [n['URL'] for n in active_data], index=tallest)
+    node = next(n for n in active_data if n['URL'] == explorer_url)
+    blocks = node['Blocks']
+    st.caption(f"Height: {node['Chain Length']} | Peers: {node['Peer Count']} | Pending Alerts: {node['Pending Alerts']}")
+
+    tab_blocks, tab_search, tab_activity = st.tabs(["📦 Blocks", "🔎 Search", "📈 Alert Activity"])
+
+    with tab_blocks:
+        col_size, col_page = st.columns(2)
+        page_size = col_size.selectbox("Blocks per page", EXPLORER_PAGE_SIZES, index=1)
+        page_count = max(1, -(-len(blocks) // page_size))
+        page = col_page.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+        # En yeni bloklar ilk sayfada
+        end = len(blocks) - (page - 1) * page_size
+        window = blocks[max(0, end - page_size):end][::-1]
+        if window:
+            st.dataframe(block_rows(window), use_container_width=True, hide_index=True)
+            selected = st.selectbox("Inspect block", [b['index'] for b in window])
+            block = next(b for b in window if b['index'] == selected)
+            st.code(f"Hash: {block['hash']}\nPrevious: {block['previous_hash']}", language="text")
+            if block['alerts']:
+                st.dataframe(alert_rows(block['alerts']), use_container_width=True, hide_index=True)
+            else:
+                st.info("Block has no alerts")
         else:
             st.warning("No blocks found")
 
+    with tab_search:
+        block_hash = st.text_input("Block hash")
+        col_sender, col_type, col_window = st.columns(3)
+        sender = col_sender.text_input("Sender")
+        alert_type = col_type.text_input("Alert type")
+        time_window = col_window.selectbox("Time range", list(TIME_WINDOWS))
+        col_limit, col_result_page = st.columns(2)
+        limit = col_limit.selectbox("Results per page", EXPLORER_PAGE_SIZES, index=1)
+        result_page = col_result_page.number_input("Result page", min_value=1, value=1)
+
+        try:
+            if block_hash.strip():
+                found = find_block(explorer_url, block_hash.strip())
+                if found is None:
+                    st.warning("Unknown block hash")
+                else:
+                    st.dataframe(block_rows([found]), use_container_width=True, hide_index=True)
+                    st.dataframe(alert_rows(found['alerts']), use_container_width=True, hide_index=True)
+            else:
+                params = {"offset": (result_page - 1) * limit, "limit": limit}
+                if sender.strip():
+                    params["sender"] = sender.strip()
+                if alert_type.strip():
+                    params["type"] = alert_type.strip()
+                if TIME_WINDOWS[time_window]:
+                    # Önbellek anahtarı her yenilemede değişmesin diye dakikaya yuvarlanır
+                    params["since"] = int(time.time() // 60 * 60) - TIME_WINDOWS[time_window]
+                result = search_alerts(explorer_url, tuple(sorted(params.items())))
+                st.caption(f"{result['total']} matching alerts")
+                if result['alerts']:
+                    st.dataframe(alert_rows(result['alerts']), use_container_width=True, hide_index=True)
+        except Exception as e:
+            st.error(f"Query failed: {e}")
+
+    with tab_activity:
+        activity = alert_activity(explorer_url, blocks[-1]['hash'] if blocks else None, blocks)
+        if activity.empty:
+            st.info("No alerts on chain yet")
+        else:
+            fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.add_trace(go.Bar(x=activity['time'], y=activity['alerts'], name="Alerts"), secondary_y=False)
+            fig.add_trace(go.Scatter(x=activity['time'], y=activity['avg_confidence'], name="Avg confidence",
+                                     mode="lines"), secondary_y=True)
+            fig.add_trace(go.Scatter(x=activity['time'], y=activity['max_confidence'], name="Max confidence",
+                                     mode="lines", line={"dash": "dot"}), secondary_y=True)
+            fig.update_yaxes(title_text="Alerts", secondary_y=False)
+            fig.update_yaxes(title_text="Confidence", secondary_y=True)
+            fig.update_layout(height=320, margin={"t": 20, "b": 20}, legend={"orientation": "h"})
+            st.plotly_chart(fig, use_container_width=True)
+
 if auto_refresh:
     time.sleep(2)
     st.rerun()
\ No newline at end of file
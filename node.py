@@ -1,19 +1,70 @@
 import os
 import uuid
+import socket
+import ipaddress
+import atexit
+import threading
+import time
 import requests
+from collections import deque
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from requests.adapters import HTTPAdapter
 import argparse
 import numpy as np 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from core.blockchain import Blockchain
-from core.detector import SentinelDetector
+from core.events import EventLog
+from core.gossip import GossipBatcher
+from core.mempool import MempoolFull
+from core.merkle import merkle_proof
+from core.records import Block, AlertColumns, to_jsonable
 from core.contracts import ContractEngine
-from utils.data_helper import load_scaler, get_test_sample
+from core.scheduler import InferenceScheduler
+from core.replay import ReplayEngine
+from utils.codec import (
+    HAS_MSGPACK, JSON_MIMETYPE, NDJSON_MIMETYPE, MSGPACK_MIMETYPE,
+    encode_json, encode_msgpack, decode_msgpack, gzip_bytes, gzip_stream,
+    iter_chain_json, iter_chain_ndjson, iter_chain_msgpack
+)
+from utils.data_helper import (
+    load_scaler, get_reader,
+    scaler_to_affine, apply_affine, iter_npy_chunks, iter_csv_chunks
+)
+
+class LedgerJSONProvider(DefaultJSONProvider):
+    """Kompakt blok/alarm kayıtlarını yalnızca API sınırında JSON'a çevirir."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (Block, AlertColumns)):
+            return to_jsonable(o)
+        return DefaultJSONProvider.default(o)
 
 app = Flask(__name__)
+app.json = LedgerJSONProvider(app)
 
 #  DÜĞÜM AYARLARI 
+def _cli_options():
+    # --backend/--mode/--data-dir bayrakları modül yüklenirken okunur; böylece 'numpy' seçilirse torch hiç import edilmez
+    if __name__ != '__main__':
+        return argparse.Namespace(backend=None, mode=None, data_dir=None)
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--backend', choices=['torch', 'numpy'])
+    pre_parser.add_argument('--mode', choices=['eager', 'script', 'compile', 'int8'])
+    pre_parser.add_argument('--data-dir')
+    return pre_parser.parse_known_args()[0]
+
+_cli = _cli_options()
+DETECTOR_BACKEND = _cli.backend or os.environ.get('SENTINEL_BACKEND', 'torch')
+DETECTOR_MODE = _cli.mode or os.environ.get('SENTINEL_MODE', 'eager')
+DATA_DIR = _cli.data_dir or os.environ.get('SENTINEL_DATA_DIR')
+
 node_id = str(uuid.uuid4())[:8]
-blockchain = Blockchain()
+# DATA_DIR verilirse defter diske yazılır ve yeniden başlatmada oradan yüklenir
+blockchain = Blockchain(storage_dir=DATA_DIR)
+atexit.register(blockchain.close)
 peers = set()
 
 # Proof-of-Reputation (PoR) Parametreleri
@@ -23,39 +74,126 @@ REPUTATION = {
     "reward": 5        # Başarılı blok üretimi ödülü
 }
 
+# Paylaşılan düğüm durumu (peer kümesi, itibar) eşzamanlı isteklerden kısa bir kilitle korunur
+state_lock = threading.Lock()
+# İtibar değiştiğinde uyanır (ör. barajın altında bekleyen otomatik mühürleyici)
+reputation_changed = threading.Condition(state_lock)
+
+# Olay akışı: blok, alarm, kontrat aksiyonu, peer ve itibar değişiklikleri sıra numarasıyla yayınlanır (/events)
+events = EventLog()
+blockchain.mempool.on_add = lambda sender, alert_type, count, confidence: events.publish("alert", {
+    "sender": sender, "type": alert_type, "count": count, "confidence": confidence,
+    "pending": len(blockchain.mempool)
+})
+
+def peer_list():
+    with state_lock:
+        return list(peers)
+
+def add_peers(addresses):
+    with state_lock:
+        added = set(addresses) - peers
+        peers.update(added)
+        peer_count = len(peers)
+    if added:
+        events.publish("peer", {"added": sorted(added), "peer_count": peer_count})
+
+def change_reputation(delta):
+    with state_lock:
+        REPUTATION["score"] += delta
+        score = REPUTATION["score"]
+        reputation_changed.notify_all()
+    events.publish("reputation", {"score": score, "delta": delta})
+    return score
+
 # YZ VE VERİ BİLEŞENLERİ 
-scaler = load_scaler('utils/scaler.pkl')
-try:
-    detector = SentinelDetector(
+def load_detector(backend, mode='eager'):
+    """Seçilen çıkarım arka ucuna göre dedektörü oluşturur."""
+    if backend == 'numpy':
+        from core.np_detector import NumpyDetector
+        return NumpyDetector(
+            weights_path='models/saved_models/autoencoder.npz',
+            threshold_path='models/saved_models/ae_threshold.npy',
+            input_dim=77,
+            model_path='models/saved_models/autoencoder.pth'
+        )
+    from core.detector import SentinelDetector
+    return SentinelDetector(
         model_path='models/saved_models/autoencoder.pth', 
         threshold_path='models/saved_models/ae_threshold.npy', 
-        input_dim=77 
+        input_dim=77,
+        mode=mode
     )
-    print(f"✅ Sentinel AI Detector Aktif (Node ID: {node_id})")
+
+scaler = load_scaler('utils/scaler.pkl')
+# Ölçekleme her istekte sklearn yerine tek bir afin adımla yapılır
+scaler_affine = scaler_to_affine(scaler) if scaler is not None else None
+try:
+    detector = load_detector(DETECTOR_BACKEND, DETECTOR_MODE)
+    print(f"✅ Sentinel AI Detector Aktif (Node ID: {node_id}, backend: {DETECTOR_BACKEND})")
 except Exception as e:
     detector = None
     print(f"❌ YZ Modeli yüklenemedi: {e}")
 
+# Test verisi tek bir kez mmap ile açılır (bkz. utils.data_helper.get_reader)
+TEST_DATA_PATH = 'data/processed/X_test_scaled.npy'
+
+def get_test_reader():
+    try:
+        return get_reader(TEST_DATA_PATH)
+    except Exception as e:
+        print(f"⚠️ Test verisi okuma hatası: {e}")
+        return None
+
+# Eşzamanlı /scan isteklerini tek bir batch'te birleştiren zamanlayıcı
+scheduler = InferenceScheduler(detector, max_batch_size=64, max_wait_ms=2.0, n_features=77) if detector else None
+
 # SMART CONTRACT ENGINE
-contract_engine = ContractEngine()
+# DATA_DIR verilirse aksiyon geçmişinin tamamı diske de eklenir (bellekte son 1000 tutulur)
+contract_engine = ContractEngine(
+    history_path=os.path.join(DATA_DIR, 'actions.log') if DATA_DIR else None
+)
+atexit.register(contract_engine.action_history.close)
+contract_engine.on_action = lambda action: events.publish("action", action.to_dict())
 print(f"📜 Smart Contract Engine initialized with {len(contract_engine.contracts)} contracts")
 
 #1. AĞ TARAMA VE TESPİT (YZ AJANI) 
+def simulated_source(row):
+    """Test setinden örneklenen satırlar için simülasyon kaynak adresi."""
+    return f"192.168.1.{row % 255}"
+
+def parse_source_ip(value):
+    """Tek bir IP adresini doğrular (CIDR önekleri ve geçersiz değerler ValueError)."""
+    if not isinstance(value, str):
+        raise ValueError(f"invalid source address {value!r}")
+    return str(ipaddress.ip_address(value))
+
 @app.route('/scan', methods=['GET'])
 def scan_network():
     """AI Ajanını kullanarak ağ trafiğini simüle eder ve anomali tarar."""
     if detector is None or scaler is None:
         return jsonify({"error": "AI Engine not ready"}), 500
 
-    # Simülasyon: Test setinden rastgele bir veri satırı çek
-    random_index = np.random.randint(0, 2000) 
-    sample = get_test_sample('data/processed/X_test_scaled.npy', index=random_index)
-    
-    if sample is None:
+    # Simülasyon: Test setinin tamamından rastgele bir veri satırı çek
+    test_reader = get_test_reader()
+    if test_reader is None:
         return jsonify({"error": "Test data not found"}), 404
 
-    # Yapay Zeka Analizi
-    is_anomaly, mse_loss = detector.predict(sample)
+    random_index = np.random.randint(0, len(test_reader))
+    simulated_ip = simulated_source(random_index)
+
+    # Engellenmiş kaynaklar çıkarım yapılmadan atlanır
+    if contract_engine.is_blocked(simulated_ip):
+        return jsonify({"result": "Source Blocked", "source_ip": simulated_ip, "skipped_inference": True}), 200
+
+    sample = test_reader.sample(random_index)
+
+    # Yapay Zeka Analizi (eşzamanlı isteklerle birlikte batch halinde)
+    try:
+        is_anomaly, mse_loss = scheduler.predict(sample)
+    except FutureTimeout:
+        # Çıkarım kuyruğu tıkalı: istemci biraz sonra tekrar denesin
+        return jsonify({"error": "Inference queue is busy"}), 503, {"Retry-After": "1"}
 
     if is_anomaly:
         # AI tehdit bulursa, otomatik olarak Blockchain havuzuna ekler
@@ -66,7 +204,6 @@ def scan_network():
         )
         
         # Smart Contract Evaluation - trigger automated responses
-        simulated_ip = f"192.168.1.{random_index % 255}"
         executed_actions = contract_engine.evaluate(
             alert_type="AI_ANOMALY_DETECTED",
             confidence=mse_loss,
@@ -83,7 +220,315 @@ def scan_network():
     
     return jsonify({"result": "Traffic Normal", "loss": mse_loss}), 200
 
+MAX_BATCH = 4096
+
+@app.route('/scan/batch', methods=['POST'])
+def scan_batch():
+    """
+    Score an (N, 77) batch of traffic rows in one forward pass.
+
+    Client rows may carry their real origin in `source_ips` (one address
+    per row); only rows with a known source - given there, or simulated
+    for test-set sampling - are skipped when that source is blocked, and
+    only they drive per-source contract actions and offense counts.
+    """
+    if detector is None or scaler is None:
+        return jsonify({"error": "AI Engine not ready"}), 500
+
+    values = request.get_json(silent=True)
+    values = {} if values is None else values
+    if not isinstance(values, dict):
+        return jsonify({"error": "body must be a JSON object"}), 400
+    samples = values.get('samples')
+    source_ips = None
+    if samples is not None:
+        try:
+            samples = np.asarray(samples, dtype=np.float32)
+        except (TypeError, ValueError):
+            return jsonify({"error": "samples must be numeric"}), 400
+        if samples.ndim != 2 or samples.shape[1] != 77:
+            return jsonify({"error": "samples must have shape (N, 77)"}), 400
+        if not 1 <= len(samples) <= MAX_BATCH:
+            return jsonify({"error": f"samples must have 1..{MAX_BATCH} rows"}), 400
+        row_ids = np.arange(len(samples))
+        test_reader = None
+        if values.get('source_ips') is not None:
+            try:
+                if len(values['source_ips']) != len(samples):
+                    raise ValueError("source_ips must have one address per sample")
+                source_ips = [parse_source_ip(ip) for ip in values['source_ips']]
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": str(e)}), 400
+    else:
+        # Simülasyon: test setinden rastgele 'size' adet satır çek
+        try:
+            size = int(values.get('size', 32))
+        except (TypeError, ValueError):
+            size = 0
+        if not 1 <= size <= MAX_BATCH:
+            return jsonify({"error": f"size must be an integer in 1..{MAX_BATCH}"}), 400
+        test_reader = get_test_reader()
+        if test_reader is None:
+            return jsonify({"error": "Test data not found"}), 404
+        row_ids = np.random.randint(0, len(test_reader), size=size)
+        source_ips = [simulated_source(row) for row in row_ids]
+
+    # Kaynağı bilinen satırlardan engellenmiş olanlar okunmaz ve skorlanmaz.
+    # Kaynaksız yüklemelerde satır sırası bir adres değildir; kontratlar kaynağı None (bilinmiyor) görür.
+    if source_ips is not None:
+        blocked = np.fromiter((contract_engine.is_blocked(ip) for ip in source_ips), dtype=bool,
+                              count=len(source_ips))
+    else:
+        source_ips = [None] * len(row_ids)
+        blocked = np.zeros(len(row_ids), dtype=bool)
+    scored = np.flatnonzero(~blocked)
+
+    is_anomaly = np.zeros(len(row_ids), dtype=bool)
+    mse_losses = np.full(len(row_ids), np.nan)
+    if len(scored):
+        rows = test_reader.rows(row_ids[scored]) if test_reader is not None else samples[scored]
+        is_anomaly[scored], mse_losses[scored] = detector.predict_batch(rows)
+    anomalous = np.flatnonzero(is_anomaly)
+
+    actions = []
+    if len(anomalous):
+        anomaly_losses = mse_losses[anomalous]
+        blockchain.add_alerts(
+            sender=node_id,
+            alert_type="AI_ANOMALY_DETECTED",
+            confidences=anomaly_losses
+        )
+        actions = contract_engine.evaluate_batch(
+            alert_types=["AI_ANOMALY_DETECTED"] * len(anomalous),
+            confidences=anomaly_losses.tolist(),
+            source_ips=[source_ips[i] for i in anomalous]
+        )
+
+    return jsonify({
+        "scanned": int(len(scored)),
+        "skipped_blocked": int(blocked.sum()),
+        "anomalies": int(len(anomalous)),
+        "anomaly_indices": anomalous.tolist(),
+        "losses": [None if b else float(loss) for b, loss in zip(blocked, mse_losses)],
+        "contracts_triggered": len(actions),
+        "actions": [a.action.value for a in actions]
+    }), 201 if len(anomalous) else 200
+
+MAX_CHUNK_ROWS = 65536
+
+@app.route('/scan/raw', methods=['POST'])
+def scan_raw():
+    """
+    Bulk-ingest raw (unscaled) flow features as a .npy or CSV body.
+
+    The body is read, scaled and scored chunk by chunk in a single pass,
+    so large uploads never have to fit in memory at once. With
+    ?source_ip=<address> the whole upload is attributed to that source
+    and refused if it is blocked; without it the source is unknown and
+    per-source contract actions are skipped.
+
+    Every chunk is parsed and shape-checked before any of its alerts are
+    recorded. If a later chunk is malformed (400) or the mempool is full
+    (503), the error response reports the progress already committed:
+    `rows_committed` rows were scored and their alerts/contracts applied,
+    so a client can resend the body from that row on.
+    """
+    if detector is None or scaler_affine is None:
+        return jsonify({"error": "AI Engine not ready"}), 500
+
+    source_ip = request.args.get('source_ip')
+    if source_ip is not None:
+        try:
+            source_ip = parse_source_ip(source_ip)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if contract_engine.is_blocked(source_ip):
+            return jsonify({"result": "Source Blocked", "source_ip": source_ip, "skipped_inference": True}), 200
+
+    content_type = request.mimetype
+    chunk_rows = min(max(1, request.args.get('chunk_rows', 4096, type=int)), MAX_CHUNK_ROWS)
+    if content_type in ('application/octet-stream', 'application/x-npy'):
+        chunks = iter_npy_chunks(request.stream, chunk_rows)
+    elif content_type in ('text/csv', 'text/plain'):
+        chunks = iter_csv_chunks(request.stream, chunk_rows)
+    else:
+        return jsonify({"error": f"Unsupported content type '{content_type}'"}), 415
+
+    scanned = 0
+    anomaly_indices, anomaly_losses = [], []
+    actions = []
+
+    def progress():
+        return {
+            "scanned": scanned,
+            "anomalies": len(anomaly_indices),
+            "anomaly_indices": anomaly_indices,
+            "anomaly_losses": anomaly_losses,
+            "contracts_triggered": len(actions),
+            "actions": [a.action.value for a in actions]
+        }
+
+    def failed(error, status, headers=None):
+        # Önceki bloklar zaten işlendi: hatayla birlikte ne kadarının kalıcı olduğu bildirilir
+        body = dict(progress(), error=error, partial=scanned > 0, rows_committed=scanned)
+        return jsonify(body), status, headers or {}
+
+    try:
+        for chunk in chunks:
+            if chunk.ndim != 2 or chunk.shape[1] != 77:
+                return failed("rows must have 77 features", 400)
+            rows = np.arange(scanned, scanned + len(chunk))
+            is_anomaly, mse_losses = detector.predict_batch(apply_affine(chunk, scaler_affine))
+            anomalous = np.flatnonzero(is_anomaly)
+            if len(anomalous):
+                losses = mse_losses[anomalous]
+                blockchain.add_alerts(
+                    sender=node_id,
+                    alert_type="AI_ANOMALY_DETECTED",
+                    confidences=losses
+                )
+                actions.extend(contract_engine.evaluate_batch(
+                    alert_types=["AI_ANOMALY_DETECTED"] * len(anomalous),
+                    confidences=losses.tolist(),
+                    source_ips=[source_ip] * len(anomalous)
+                ))
+                anomaly_indices.extend(rows[anomalous].tolist())
+                anomaly_losses.extend(losses.tolist())
+            scanned += len(chunk)
+    except ValueError as e:
+        return failed(f"Malformed body: {e}", 400)
+    except MempoolFull as e:
+        # add_alerts hep-ya-hiç: bu bloğun alarmları eklenmedi, öncekiler kalıcı
+        return failed(str(e), 503, {"Retry-After": "1"})
+
+    return jsonify(progress()), 201 if anomaly_indices else 200
+
+@app.route('/scan/scheduler', methods=['GET'])
+def scheduler_stats():
+    """Report micro-batching queue depth, batch sizes and wait times."""
+    if scheduler is None:
+        return jsonify({"error": "AI Engine not ready"}), 500
+    stats = scheduler.get_stats()
+    stats["execution_mode"] = getattr(detector, "mode", DETECTOR_BACKEND)
+    stats["drift_report"] = getattr(detector, "drift_report", None)
+    return jsonify(stats), 200
+
+# Replay: test setinin tamamını sabit boyutlu bloklarla dedektörden geçirir
+replay_engine = None
+# Kontrol-ve-başlat tek adımda: eşzamanlı iki /replay/start ikinci bir replay açamaz
+replay_lock = threading.Lock()
+
+def _replay_options(values, dataset_rows):
+    """Validate the /replay/start body; raises ValueError on bad input."""
+    if not isinstance(values, dict):
+        raise ValueError("body must be a JSON object")
+    try:
+        chunk_rows = int(values.get('chunk_rows', 4096))
+        prefetch = int(values.get('prefetch', 2))
+        start = int(values.get('start', 0))
+        stop = values.get('stop')
+        stop = dataset_rows if stop is None else int(stop)
+        rate = values.get('rate')
+        rate = float(rate) if rate else None
+    except (TypeError, ValueError):
+        raise ValueError("chunk_rows, prefetch, start and stop must be integers and rate a number")
+    if chunk_rows < 1 or prefetch < 1:
+        raise ValueError("chunk_rows and prefetch must be positive")
+    if not 0 <= start <= stop <= dataset_rows:
+        raise ValueError(f"need 0 <= start <= stop <= {dataset_rows}")
+    if rate is not None and not rate > 0:
+        raise ValueError("rate must be positive")
+    return chunk_rows, prefetch, start, stop, rate
+
+@app.route('/replay/start', methods=['POST'])
+def replay_start():
+    """Start streaming the whole test set through the detector in the background."""
+    global replay_engine
+    if detector is None:
+        return jsonify({"error": "AI Engine not ready"}), 500
+    test_reader = get_test_reader()
+    if test_reader is None:
+        return jsonify({"error": "Test data not found"}), 404
+
+    values = request.get_json(silent=True)
+    values = {} if values is None else values
+    try:
+        chunk_rows, prefetch, start, stop, rate = _replay_options(values, len(test_reader))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    record_alerts = bool(values.get('record_alerts', False))
+
+    with replay_lock:
+        if replay_engine is not None and replay_engine.running:
+            return jsonify({"error": "Replay already running"}), 409
+        replay_engine = ReplayEngine(test_reader, detector, chunk_rows=chunk_rows, rate=rate, prefetch=prefetch)
+        # run() çalışıyor bayrağını hemen koyar; kilit bırakıldığında yeni istekler 409 alır
+        stream = replay_engine.run(start, stop)
+
+    def consume():
+        try:
+            for result in stream:
+                if record_alerts and result["flags"].any():
+                    try:
+                        blockchain.add_alerts(
+                            sender=node_id,
+                            alert_type="AI_ANOMALY_DETECTED",
+                            confidences=result["mse"][result["flags"]]
+                        )
+                    except MempoolFull:
+                        pass  # havuz dolu: reddedilenler mempool istatistiklerinde sayılır
+        except Exception as e:
+            print(f"⚠️ Replay failed: {e}")
+
+    threading.Thread(target=consume, name="replay", daemon=True).start()
+    return jsonify({"message": "Replay started", "dataset_rows": len(test_reader)}), 202
+
+@app.route('/replay/status', methods=['GET'])
+def replay_status():
+    """Report progress and sustained throughput of the current/last replay."""
+    if replay_engine is None:
+        return jsonify({"running": False, "message": "No replay has been started"}), 200
+    return jsonify(replay_engine.get_stats()), 200
+
+@app.route('/replay/stop', methods=['POST'])
+def replay_stop():
+    if replay_engine is not None:
+        replay_engine.stop()
+    return jsonify({"message": "Replay stopping"}), 200
+
 # 2. BLOK ÜRETİMİ (POR KONTROLÜ)
+# Blok üretimi hem /mine hem de arka plan mühürleyicisinden yapılabilir; defter kilidi tek seferde bir blok sağlar
+def seal_block():
+    """Seal pending alerts into a new block and reward reputation; None if the pool is empty."""
+    new_block = blockchain.mine_block(node_id)
+    if new_block is not None:
+        events.publish("block", Blockchain.block_header(new_block))
+        #otomatik ödül: Başarılı blok mühürlendiği için itibar artar
+        score = change_reputation(REPUTATION["reward"])
+        print(f"Reputation Score Updated: {score}")
+    return new_block
+
+SEAL_BACKOFF = 5.0
+
+def _can_mine():
+    return REPUTATION["score"] >= REPUTATION["threshold"]
+
+def auto_seal_loop(min_alerts, max_age):
+    """Background sealer: mine when the pool holds min_alerts entries or its oldest entry is max_age seconds old."""
+    while True:
+        if not blockchain.mempool.wait_for_seal(min_alerts, max_age, timeout=1.0):
+            continue
+        # İtibar barajı otomatik mühürlemede de geçerli
+        if not _can_mine():
+            # Havuz hâlâ mühürlenmeye hazır olacağından hemen dönmek meşgul döngü olurdu:
+            # itibar barajı aşılana kadar (en fazla SEAL_BACKOFF saniye) bekle
+            with reputation_changed:
+                reputation_changed.wait_for(_can_mine, timeout=SEAL_BACKOFF)
+            continue
+        block = seal_block()
+        if block is not None:
+            print(f"🧱 Auto-sealed block #{block['index']} ({len(block['alerts'])} alerts)")
+
 @app.route('/mine', methods=['GET'])
 def mine():
     """PoR protokolüne göre blok üretir ve düğüme itibar kazandırır."""
@@ -95,16 +540,9 @@ def mine():
         }), 403
 
     # Havuz Kontrolü: Bekleyen alarm yoksa blok üretme
-    if not blockchain.pending_alerts:
+    new_block = seal_block()
+    if new_block is None:
         return jsonify({"message": "No pending alerts in pool"}), 200
-
-    last_block = blockchain.get_last_block()
-    new_block = blockchain.create_block(last_block['hash'], node_id)
-    
-    if new_block:
-        #otomatik ödül: Başarılı blok mühürlendiği için itibar artar
-        REPUTATION["score"] += REPUTATION["reward"]
-        print(f"Reputation Score Updated: {REPUTATION['score']}")
     
     return jsonify({
         "message": "New Block Successfully Mined", 
@@ -112,76 +550,444 @@ def mine():
         "new_reputation": REPUTATION["score"]
     }), 200
 
+@app.route('/mempool', methods=['GET'])
+def mempool_status():
+    """Pending pool size, limits and accepted/coalesced/rejected counters."""
+    return jsonify(blockchain.mempool.get_stats()), 200
+
+@app.errorhandler(MempoolFull)
+def mempool_full(error):
+    # Geri basınç: dış istemciler için 429, düğümün kendi taramaları için 503
+    status = 429 if request.path == '/alert/new' else 503
+    return jsonify({"error": "Mempool full", "message": str(error)}), status, {"Retry-After": "1"}
+
 @app.route('/status', methods=['GET'])
 def status():
     """Düğümün sağlık ve ağ bilgisini raporlar."""
+    current_peers = peer_list()
     return jsonify({
         "id": node_id,
         "reputation": REPUTATION["score"],
-        "pending_alerts": len(blockchain.pending_alerts),
+        "pending_alerts": len(blockchain.mempool),
         "chain_length": len(blockchain.chain),
-        "peer_count": len(peers),
-        "peers": list(peers),
+        "peer_count": len(current_peers),
+        "peers": current_peers,
         "status": "Active"
     }), 200
 
+# Dışa aktarım: içerik anlaşması (JSON / NDJSON / msgpack) ve gzip
+GZIP_MIN_BYTES = 1024
+MAX_SYNC_PAGE = 500
+
+def _wants_gzip():
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+def _wants_msgpack():
+    if request.args.get('format') == 'msgpack':
+        return True
+    return HAS_MSGPACK and request.accept_mimetypes.best == MSGPACK_MIMETYPE
+
+def _encoded_response(payload, status=200):
+    """Boyutu sınırlı yanıtlar için JSON/msgpack kodlama ve gerekirse gzip."""
+    if _wants_msgpack():
+        if not HAS_MSGPACK:
+            return jsonify({"error": "msgpack is not installed on this node"}), 406
+        body, mimetype = encode_msgpack(payload), MSGPACK_MIMETYPE
+    else:
+        body, mimetype = encode_json(payload), JSON_MIMETYPE
+    headers = {'Vary': 'Accept, Accept-Encoding'}
+    if _wants_gzip() and len(body) >= GZIP_MIN_BYTES:
+        body = gzip_bytes(body)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(body, status=status, mimetype=mimetype, headers=headers)
+
+def _streamed_response(chunks, mimetype):
+    headers = {'Vary': 'Accept, Accept-Encoding'}
+    if _wants_gzip():
+        chunks = gzip_stream(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    return Response(chunks, mimetype=mimetype, headers=headers)
+
 @app.route('/chain', methods=['GET'])
 def get_chain():
-    return jsonify({'chain': blockchain.chain, 'length': len(blockchain.chain)}), 200
+    """
+    Export the chain.
+
+    ?cursor=<block index>&limit=<n> returns one page with `next_cursor`;
+    otherwise the whole chain is streamed block by block (constant memory)
+    as JSON, NDJSON (?format=ndjson) or msgpack (?format=msgpack or
+    Accept: application/msgpack). gzip is applied when the client accepts it.
+    """
+    length = len(blockchain.chain)
+    if 'cursor' in request.args or 'limit' in request.args:
+        cursor = max(1, request.args.get('cursor', 1, type=int))
+        limit = min(max(1, request.args.get('limit', 100, type=int)), MAX_SYNC_PAGE)
+        page = list(blockchain.iter_blocks(cursor - 1, cursor - 1 + limit))
+        next_cursor = cursor + len(page) if cursor - 1 + len(page) < length else None
+        return _encoded_response({'chain': page, 'length': length, 'next_cursor': next_cursor})
+
+    # Akış sırasında eklenen bloklar dahil edilmez: uzunluk istek anında sabitlenir
+    blocks = blockchain.iter_blocks(0, length)
+    if _wants_msgpack():
+        if not HAS_MSGPACK:
+            return jsonify({"error": "msgpack is not installed on this node"}), 406
+        return _streamed_response(iter_chain_msgpack(blocks), MSGPACK_MIMETYPE)
+    if request.args.get('format') == 'ndjson':
+        return _streamed_response(iter_chain_ndjson(blocks), NDJSON_MIMETYPE)
+    return _streamed_response(iter_chain_json(blocks, length), JSON_MIMETYPE)
+
+# Defter sorguları: ikincil indeksler üzerinden, tüm zinciri taramadan
+MAX_QUERY_PAGE = 1000
+
+@app.route('/ledger/block/<block_hash>', methods=['GET'])
+def ledger_block(block_hash):
+    block = blockchain.get_block_by_hash(block_hash)
+    if block is None:
+        return jsonify({"error": "Unknown block hash"}), 404
+    return jsonify(block), 200
+
+@app.route('/ledger/alerts', methods=['GET'])
+def ledger_alerts():
+    """Paged alert query: ?sender=&type=&since=&until=&offset=&limit= (times in epoch seconds)."""
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(0, request.args.get('limit', 100, type=int)), MAX_QUERY_PAGE)
+    total, alerts = blockchain.query_alerts(
+        sender=request.args.get('sender'),
+        alert_type=request.args.get('type'),
+        since=request.args.get('since', type=float),
+        until=request.args.get('until', type=float),
+        offset=offset,
+        limit=limit
+    )
+    return jsonify({
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + len(alerts) if offset + len(alerts) < total else None,
+        "alerts": alerts
+    }), 200
 
 @app.route('/nodes/register', methods=['POST'])
 def register():
     data = request.get_json()
     nodes = data.get('nodes')
     if nodes:
-        for node in nodes: peers.add(node)
-    return jsonify({"total_peers": list(peers)}), 201
+        add_peers(nodes)
+    return jsonify({"total_peers": peer_list()}), 201
+
+# Delta senkronizasyonu: tüm zincir yerine uç (tip), başlıklar ve eksik bloklar
+
+@app.route('/chain/tip', methods=['GET'])
+def chain_tip():
+    """Current height and tip hash - the only thing resolve needs to compare chains."""
+    last_block = blockchain.get_last_block()
+    return jsonify({"length": len(blockchain.chain), "hash": last_block['hash']}), 200
+
+@app.route('/chain/headers', methods=['GET'])
+def chain_headers():
+    """Block headers (no alerts) for indices [start, start + count)."""
+    start = max(1, request.args.get('start', 1, type=int))
+    count = min(max(0, request.args.get('count', 100, type=int)), MAX_SYNC_PAGE)
+    blocks = blockchain.chain[start - 1:start - 1 + count]
+    return jsonify({
+        "headers": [Blockchain.block_header(b) for b in blocks],
+        "length": len(blockchain.chain)
+    }), 200
+
+@app.route('/chain/blocks', methods=['GET'])
+def chain_blocks():
+    """Full blocks from index `from` onward, paged by `limit`."""
+    start = max(1, request.args.get('from', 1, type=int))
+    limit = min(max(0, request.args.get('limit', MAX_SYNC_PAGE, type=int)), MAX_SYNC_PAGE)
+    blocks = list(blockchain.iter_blocks(start - 1, start - 1 + limit))
+    return _encoded_response({"blocks": blocks, "length": len(blockchain.chain)})
+
+# Peer iletişimi: keep-alive bağlantı havuzu paylaşan tek bir oturum ve eşzamanlı istekler
+PEER_TIMEOUT = 3
+RESOLVE_DEADLINE = 5.0
+
+http = requests.Session()
+http.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+http.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+peer_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="peer")
+SYNC_HEADERS = {'Accept': f"{MSGPACK_MIMETYPE}, {JSON_MIMETYPE};q=0.5"} if HAS_MSGPACK else {}
+
+def _peer_url(peer, path):
+    # peer değişkeni zaten 'http://...' içerebilir; içermiyorsa ekliyoruz
+    return f"{peer}{path}" if peer.startswith('http') else f"http://{peer}{path}"
+
+def _find_fork_point(peer, peer_length, timeout=PEER_TIMEOUT):
+    """
+    Bizim zincirimizle peer zincirinin ortak önek uzunluğunu başlıklardan bulur.
+    Uçtan geriye doğru, her adımda iki katına çıkan pencerelerle başlık çeker.
+    """
+    top = min(len(blockchain.chain), peer_length)
+    window = 16
+    while top > 0:
+        start = max(1, top - window + 1)
+        response = http.get(_peer_url(peer, '/chain/headers'),
+                            params={"start": start, "count": top - start + 1}, timeout=timeout)
+        response.raise_for_status()
+        headers = response.json()['headers']
+        # Başlıklar birbirine bağlı ve hash'leri içerikleriyle tutarlı olmalı (alarmlar indirilmeden)
+        if not Blockchain.validate_headers(headers):
+            raise ValueError(f"peer sent invalid headers for {start}..{top}")
+        for header in reversed(headers):
+            index = header.get('index')
+            # İstenen aralık dışındaki (veya sayı olmayan) index yerel zincire uzanamaz; peer reddedilir
+            if type(index) is not int or not start <= index <= top:
+                raise ValueError(f"peer sent header index {index!r} outside {start}..{top}")
+            if header['hash'] == blockchain.chain[index - 1]['hash']:
+                return index
+        top = start - 1
+        window = min(window * 2, MAX_SYNC_PAGE)
+    return 0
+
+def _fetch_blocks(peer, start, end, timeout=PEER_TIMEOUT):
+    """Peer'dan [start, end] aralığındaki blokları sayfalı olarak indirir."""
+    blocks = []
+    while start + len(blocks) <= end:
+        response = http.get(_peer_url(peer, '/chain/blocks'),
+                            params={"from": start + len(blocks), "limit": MAX_SYNC_PAGE},
+                            headers=SYNC_HEADERS, timeout=timeout)
+        response.raise_for_status()
+        # Peer msgpack destekliyorsa daha küçük ikili yük; gzip'i requests otomatik açar
+        if response.headers.get('Content-Type', '').startswith(MSGPACK_MIMETYPE):
+            page = decode_msgpack(response.content)['blocks']
+        else:
+            page = response.json()['blocks']
+        if not page:
+            break
+        blocks.extend(page)
+    return blocks[:end - start + 1]
+
+def _sync_candidate(peer, my_length, my_tip):
+    """
+    Tek bir peer'dan aday zincir uzantısını çeker ve doğrular.
+
+    Returns:
+        (length, fork_length, new_blocks) or None if the peer has nothing better
+    """
+    print(f"🌐 {_peer_url(peer, '/chain/tip')} adresine bağlanılıyor...")
+    response = http.get(_peer_url(peer, '/chain/tip'), timeout=PEER_TIMEOUT)
+    if response.status_code != 200:
+        return None
+    tip = response.json()
+    length = tip['length']
+
+    print(f"📊 Peer uzunluğu: {length} | Benimki: {my_length}")
+
+    if length <= my_length or tip['hash'] == my_tip:
+        return None
+
+    # Sadece çatallanma noktasından sonraki eksik blokları indir
+    fork_length = _find_fork_point(peer, length)
+    new_blocks = _fetch_blocks(peer, fork_length + 1, length)
+    print(f"⚙️ Zincir daha uzun, {len(new_blocks)} yeni blok doğrulanıyor (çatal: {fork_length})...")
+    if len(new_blocks) == length - fork_length and blockchain.validate_extension(fork_length, new_blocks):
+        print(f"✅ {peer} zinciri geçerli bulundu!")
+        return length, fork_length, new_blocks
+    print(f"❌ {peer} zincir doğrulama hatası! (Genesis uyuşmazlığı olabilir)")
+    return None
 
 @app.route('/nodes/resolve', methods=['GET'])
 def resolve():
-    longest_chain = None
-    max_length = len(blockchain.chain)
+    best = None  # (length, fork_length, new_blocks)
+    my_length = len(blockchain.chain)
+    my_tip = blockchain.get_last_block()['hash']
+    deadline = request.args.get('deadline', RESOLVE_DEADLINE, type=float)
     
-    print(f"🔍 Resolve tetiklendi. Mevcut uzunluk: {max_length}")
-    print(f"📡 Kontrol edilen peer listesi: {list(peers)}")
+    print(f"🔍 Resolve tetiklendi. Mevcut uzunluk: {my_length}")
+    print(f"📡 Kontrol edilen peer listesi: {peer_list()}")
 
-    for peer in peers:
-        try:
-            # peer değişkeni zaten 'http://...' içerdiği için tekrar eklemiyoruz
-            url = f"{peer}/chain" if peer.startswith('http') else f"http://{peer}/chain"
-            print(f"🌐 {url} adresine bağlanılıyor...")
-            
-            response = requests.get(url, timeout=3)
-            if response.status_code == 200:
-                length = response.json()['length']
-                chain = response.json()['chain']
-                
-                print(f"📊 Peer uzunluğu: {length} | Benimki: {max_length}")
-                
-                if length > max_length:
-                    print("⚙️ Zincir daha uzun, doğrulama (validation) başlatılıyor...")
-                    if blockchain.validate_chain(chain):
-                        max_length = length
-                        longest_chain = chain
-                        print("✅ Zincir geçerli bulundu!")
-                    else:
-                        print("❌ Zincir doğrulama hatası! (Genesis uyuşmazlığı olabilir)")
-        except Exception as e:
-            print(f"⚠️ {peer} düğümüne ulaşılamadı: {e}")
-            continue
+    # Tüm peer'lar eşzamanlı sorgulanır; en iyi geçerli aday sonuçlar geldikçe seçilir
+    futures = {peer_pool.submit(_sync_candidate, peer, my_length, my_tip): peer for peer in peer_list()}
+    timed_out = 0
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            try:
+                candidate = future.result()
+            except Exception as e:
+                print(f"⚠️ {futures[future]} düğümüne ulaşılamadı: {e}")
+                continue
+            if candidate and (best is None or candidate[0] > best[0]):
+                best = candidate
+    except FutureTimeout:
+        timed_out = sum(1 for f in futures if not f.done())
+        print(f"⏱️ Resolve süresi doldu; {timed_out} peer beklenmedi")
         
-    if longest_chain:
-        blockchain.chain = longest_chain
-        return jsonify({"message": "Synchronized", "new_length": max_length}), 200
+    # Uç bu arada değiştiyse (eşzamanlı blok üretimi) aday uygulanmaz
+    if best and blockchain.adopt_extension(best[1], best[2], expected_tip=my_tip):
+        length, fork_length, new_blocks = best
+        # İstemciler çatal noktasından sonrasını yeniden çekebilsin
+        events.publish("chain", {
+            "fork_point": fork_length,
+            "length": len(blockchain.chain),
+            "tip": blockchain.get_last_block()['hash']
+        })
+        return jsonify({
+            "message": "Synchronized",
+            "new_length": length,
+            "fork_point": fork_length,
+            "blocks_downloaded": len(new_blocks),
+            "peers_timed_out": timed_out
+        }), 200
     
-    return jsonify({"message": "Already up to date or validation failed"}), 200
+    return jsonify({"message": "Already up to date or validation failed", "peers_timed_out": timed_out}), 200
+
+# Alarm dedikodusu (gossip): ALERT_NETWORK tehditleri küçük partiler halinde rastgele peer'lara itilir
+NETWORK_ALERTS_KEPT = 500
+network_alerts = deque(maxlen=NETWORK_ALERTS_KEPT)  # peer'lardan gelen son tehditler
+
+def _send_gossip(peer, payload):
+    response = http.post(_peer_url(peer, '/gossip/alerts'), json=payload, timeout=PEER_TIMEOUT)
+    response.raise_for_status()
+
+# Dedikodu gönderimleri ayrı, küçük bir havuzda: yavaş peer'lar senkronizasyon (peer_pool) iş parçacıklarını tutmaz
+gossip_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gossip")
+gossip = GossipBatcher(_send_gossip, peer_list, origin=node_id, executor=gossip_pool)
+
+def broadcast_threat(threat):
+    return gossip.publish(dict(threat, sender=node_id))
+
+contract_engine.broadcast = broadcast_threat
+
+HOST_CACHE_TTL = 60.0
+HOST_CACHE_SIZE = 256
+_host_cache = {}  # host -> (expires_at, adresler)
+
+def _host_addresses(host):
+    # DNS sonucu TTL kadar saklanır; peer'ın adresi değişirse en geç bu süre sonra yeniden çözülür
+    now = time.monotonic()
+    cached = _host_cache.get(host)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    try:
+        addresses = frozenset(info[4][0] for info in socket.getaddrinfo(host, None))
+    except (socket.gaierror, UnicodeError):
+        addresses = frozenset()
+    if len(_host_cache) >= HOST_CACHE_SIZE:
+        _host_cache.clear()
+    _host_cache[host] = (now + HOST_CACHE_TTL, addresses)
+    return addresses
+
+def is_known_peer(remote_addr):
+    """
+    Gossip yalnızca kayıtlı peer adreslerinden (çözümlenmiş IP'leri) kabul edilir.
+    Bu kontrol /nodes/register kadar güçlüdür: kayıt kimlik doğrulamasız olduğundan
+    kendini peer olarak kaydeden herhangi bir istemci de kabul edilir.
+    """
+    for peer in peer_list():
+        host = urlsplit(_peer_url(peer, '')).hostname
+        if host and remote_addr in _host_addresses(host):
+            return True
+    return False
+
+@app.route('/gossip/alerts', methods=['POST'])
+def gossip_alerts():
+    """Receive a gossip batch from a known peer; alerts already seen (by content id) are dropped."""
+    if not is_known_peer(request.remote_addr):
+        return jsonify({"error": "Gossip is only accepted from registered peers"}), 403
+    values = request.get_json(silent=True)
+    alerts = values.get('alerts') if isinstance(values, dict) else None
+    if not isinstance(alerts, list):
+        return jsonify({"error": "alerts must be a list"}), 400
+    fresh = gossip.receive([a for a in alerts if isinstance(a, dict)])
+    for alert in fresh:
+        network_alerts.append(alert)
+        # Uzak düğümün gördüğü kaynak burada da hız sınırına alınır; yalnızca tek adres (önek/CIDR değil)
+        try:
+            source_ip = parse_source_ip(alert.get('source_ip'))
+        except ValueError:
+            continue
+        contract_engine.rate_limited.add(source_ip, ttl=contract_engine.rate_limit_ttl)
+    return jsonify({"accepted": len(fresh), "duplicates": len(alerts) - len(fresh)}), 202
+
+@app.route('/gossip/status', methods=['GET'])
+def gossip_status():
+    """Gossip counters plus the most recent alerts learned from peers."""
+    limit = min(max(0, request.args.get('limit', 20, type=int)), NETWORK_ALERTS_KEPT)
+    recent = list(network_alerts)[-limit:] if limit else []
+    return jsonify({"stats": gossip.get_stats(), "recent": recent}), 200
+
+# Anlık olay akışı (Server-Sent Events): istemciler yoklama yerine değişiklikleri dinler.
+# Her açık akış ve bekleyen uzun yoklama bir sunucu iş parçacığını tutar; sayıları sınırlanır
+# ki abone sayısı /scan, /mine ve peer senkronizasyonunu aç bırakmasın.
+EVENT_HEARTBEAT = 15.0
+MAX_POLL_WAIT = 30.0
+event_slots = threading.BoundedSemaphore(16)  # __main__ içinde --max-subscribers ile yeniden kurulur
+
+def _event_start():
+    # Last-Event-ID (tarayıcı yeniden bağlanması) > ?since= > yalnızca yeni olaylar
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', events.last_seq, type=int)
+    return since
+
+def _sse(event_type, payload, seq=None):
+    head = b'id: %d\n' % seq if seq is not None else b''
+    return head + b'event: ' + event_type.encode() + b'\ndata: ' + encode_json(payload) + b'\n\n'
+
+@app.route('/events', methods=['GET'])
+def event_stream():
+    """
+    Server-sent event stream of block / chain / alert / action / peer / reputation events.
+    Resume with Last-Event-ID or ?since=<seq>; filter with ?types=block,action.
+    A 'reset' event means the requested sequence is gone and full state should be refetched.
+    """
+    if not event_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many event subscribers",
+                        "message": "Retry later or use /events/poll"}), 503, {"Retry-After": "5"}
+    since = _event_start()
+    types = set(filter(None, request.args.get('types', '').split(','))) or None
+
+    def generate():
+        seq = since
+        yield b'retry: 2000\n\n'
+        while True:
+            batch, reset = events.wait(seq, EVENT_HEARTBEAT)
+            if reset:
+                yield _sse("reset", {"requested": seq, "last_seq": events.last_seq})
+            if not batch:
+                if reset:
+                    seq = events.last_seq
+                yield b': keep-alive\n\n'
+                continue
+            for event in batch:
+                if types is None or event["type"] in types:
+                    yield _sse(event["type"], event, event["seq"])
+            seq = batch[-1]["seq"]
+
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Sunucu akışı kapattığında (istemci koptuğunda dahil) yer serbest kalır
+    response.call_on_close(event_slots.release)
+    return response
+
+@app.route('/events/poll', methods=['GET'])
+def event_poll():
+    """
+    Long-poll variant for clients without SSE: ?since=<seq>&timeout=<s>&limit=<n>.
+    Waiting polls share the subscriber limit; without a free slot the poll answers immediately.
+    """
+    since = _event_start()
+    timeout = min(max(0.0, request.args.get('timeout', 0.0, type=float)), MAX_POLL_WAIT)
+    limit = min(max(1, request.args.get('limit', 500, type=int)), MAX_QUERY_PAGE)
+    if timeout and event_slots.acquire(blocking=False):
+        try:
+            batch, reset = events.wait(since, timeout, limit)
+        finally:
+            event_slots.release()
+    else:
+        batch, reset = events.since(since, limit)
+    return jsonify({"events": batch, "reset": reset, "last_seq": events.last_seq}), 200
 
 # 4. GELİŞTİRME VE TEST ARAÇLARI
 @app.route('/reputation/boost', methods=['GET', 'POST'])
 def boost():
     """Sadece test/sunum amaçlı manuel itibar artırıcı."""
-    REPUTATION["score"] += 10
-    return jsonify({"message": "Test Boost Applied", "new_score": REPUTATION["score"]}), 200
+    score = change_reputation(10)
+    return jsonify({"message": "Test Boost Applied", "new_score": score}), 200
 
 @app.route('/alert/new', methods=['POST'])
 def manual_alert():
@@ -192,6 +998,30 @@ def manual_alert():
     index = blockchain.add_alert(values['sender'], values['type'], values['confidence'])
     return jsonify({'message': f'Manual alert added to block {index}'}), 201
 
+@app.route('/alert/proof', methods=['GET'])
+def alert_proof():
+    """Merkle inclusion proof for one alert: ?block=<index>&position=<alert position>."""
+    block_index = request.args.get('block', type=int)
+    position = request.args.get('position', 0, type=int)
+    if block_index is None or not 1 <= block_index <= len(blockchain.chain):
+        return jsonify({"error": "Unknown block index"}), 404
+
+    block = blockchain.chain[block_index - 1]
+    if 'merkle_root' not in block:
+        return jsonify({"error": "Block predates Merkle roots; no proof available"}), 409
+    try:
+        proof = merkle_proof(block['alerts'], position)
+    except IndexError:
+        return jsonify({"error": "Unknown alert position"}), 404
+
+    return jsonify({
+        "alert": block['alerts'][position],
+        "position": position,
+        "proof": proof,
+        "merkle_root": block['merkle_root'],
+        "header": Blockchain.block_header(block)
+    }), 200
+
 # 5. SMART CONTRACT API
 @app.route('/contracts', methods=['GET'])
 def get_contracts():
@@ -201,6 +1031,40 @@ def get_contracts():
         "status": contract_engine.get_status()
     }), 200
 
+@app.route('/contracts/blocklist', methods=['GET'])
+def get_blocklist():
+    """Paged blocklist: ?kind=blocked|rate_limited&offset=&limit="""
+    kind = request.args.get('kind', 'blocked')
+    if kind not in ('blocked', 'rate_limited'):
+        return jsonify({"error": "kind must be 'blocked' or 'rate_limited'"}), 400
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(0, request.args.get('limit', 100, type=int)), MAX_QUERY_PAGE)
+    total, entries = contract_engine.get_blocklist(kind, offset, limit)
+    return jsonify({
+        "kind": kind,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + len(entries) if offset + len(entries) < total else None,
+        "entries": entries
+    }), 200
+
+@app.route('/contracts/history', methods=['GET'])
+def get_action_history():
+    """Paged action history, newest first: ?offset=&limit= (only the retained ring buffer)."""
+    history = contract_engine.action_history
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(0, request.args.get('limit', 50, type=int)), MAX_QUERY_PAGE)
+    actions = history.page(offset, limit)
+    return jsonify({
+        "total_executed": history.total,
+        "retained": len(history),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + len(actions) if offset + len(actions) < len(history) else None,
+        "actions": [a.to_dict() for a in actions]
+    }), 200
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Sentinel Mesh Node")
     
@@ -210,15 +1074,82 @@ if __name__ == '__main__':
     # --peers ile başlangıçta bağlanılacak düğümler alınır
     parser.add_argument('--peers', nargs='*', help='Initial peer list (e.g. 127.0.0.1:5000)')
     
+    # Çıkarım arka ucu ve modu (modül yüklenirken _cli_options tarafından uygulanır)
+    parser.add_argument('--backend', choices=['torch', 'numpy'], default=DETECTOR_BACKEND,
+                        help='Inference backend; numpy starts without importing torch')
+    parser.add_argument('--mode', choices=['eager', 'script', 'compile', 'int8'], default=DETECTOR_MODE,
+                        help='Torch execution mode (traced, torch.compile or dynamic int8)')
+
+    parser.add_argument('--data-dir', default=DATA_DIR,
+                        help='Directory for the persistent ledger (in-memory if omitted)')
+
+    # Micro-batching ayarları: gecikme/verim dengesini belirler
+    parser.add_argument('--batch-size', default=64, type=int, help='Max samples per inference batch')
+    parser.add_argument('--max-wait-ms', default=2.0, type=float, help='Max time a /scan sample waits for its batch')
+
+    # Alarm havuzu: kapasite, birleştirme penceresi ve blok başına en fazla kayıt
+    parser.add_argument('--mempool-size', default=10000, type=int, help='Max pending alert entries (429/503 when full)')
+    parser.add_argument('--coalesce-ms', default=1000.0, type=float,
+                        help='Merge same (sender, type) alerts arriving within this window; 0 disables')
+    parser.add_argument('--block-max-alerts', default=1000, type=int, help='Max alert entries sealed into one block')
+    # Arka plan mühürleyici: N kayıt veya T ms dolunca otomatik blok (verilmezse kapalı)
+    parser.add_argument('--seal-alerts', type=int, help='Auto-seal a block once this many entries are pending')
+    parser.add_argument('--seal-ms', type=float, help='Auto-seal once the oldest pending entry is this old')
+
+    # Gossip: parti başına hedef peer sayısı, birleştirme süresi ve atlama bütçesi
+    parser.add_argument('--gossip-fanout', default=3, type=int, help='Peers each gossip batch is pushed to')
+    parser.add_argument('--gossip-flush-ms', default=50.0, type=float, help='Max time an alert waits for its gossip batch')
+    parser.add_argument('--gossip-ttl', default=3, type=int, help='Hops a gossiped alert may be relayed')
+
+    # Sunucu: 'waitress' üretim WSGI sunucusu (iş parçacığı havuzu), 'dev' Flask geliştirme sunucusu
+    parser.add_argument('--server', choices=['dev', 'waitress'], default='dev',
+                        help='WSGI server; waitress serves requests from a thread pool')
+    parser.add_argument('--threads', default=8, type=int, help='Request threads for the waitress server')
+    parser.add_argument('--max-subscribers', type=int,
+                        help='Concurrent /events streams and waiting polls, each holding a request thread '
+                             '(default: a quarter of --threads with waitress, 16 otherwise)')
+
     args = parser.parse_args()
 
+    if args.max_subscribers is None:
+        args.max_subscribers = max(1, args.threads // 4) if args.server == 'waitress' else 16
+    event_slots = threading.BoundedSemaphore(max(1, args.max_subscribers))
+    gossip.fanout = args.gossip_fanout
+    gossip.flush_ms = args.gossip_flush_ms
+    gossip.ttl = args.gossip_ttl
+    blockchain.mempool.capacity = args.mempool_size
+    blockchain.mempool.coalesce_window = args.coalesce_ms / 1000.0
+    blockchain.mempool.max_block_alerts = args.block_max_alerts
+    if args.seal_alerts or args.seal_ms:
+        threading.Thread(
+            target=auto_seal_loop,
+            args=(args.seal_alerts or args.block_max_alerts,
+                  args.seal_ms / 1000.0 if args.seal_ms else float('inf')),
+            name="auto-sealer", daemon=True
+        ).start()
+
+    if scheduler is not None:
+        scheduler.max_batch_size = args.batch_size
+        scheduler.max_wait_ms = args.max_wait_ms
+
     # Eğer başlangıçta peer adresleri verilmişse, bunları peers listesine ekle
     if args.peers:
         for peer_addr in args.peers:
             # Başına http:// ekli değilse :
             formatted_peer = peer_addr if peer_addr.startswith('http') else f"http://{peer_addr}"
-            peers.add(formatted_peer)
+            add_peers([formatted_peer])
             print(f"🔗 Startup: Registered initial peer: {formatted_peer}")
 
-    # Sunucuyu başlat
-    app.run(host='0.0.0.0', port=args.port)
\ No newline at end of file
+    # Sunucuyu başlat: tek süreç, çok iş parçacığı; dedektör ve defter tüm isteklerce paylaşılır
+    serve = None
+    if args.server == 'waitress':
+        try:
+            from waitress import serve
+        except ImportError:
+            print("⚠️ waitress is not installed; falling back to the threaded development server")
+
+    if serve is not None:
+        print(f"🌐 Serving with waitress on port {args.port} ({args.threads} threads)")
+        serve(app, host='0.0.0.0', port=args.port, threads=args.threads)
+    else:
+        app.run(host='0.0.0.0', port=args.port, threaded=True)
\ No newline at end of file
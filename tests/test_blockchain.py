@@ -0,0 +1,33 @@
+from core.blockchain import Blockchain
+from core.merkle import merkle_root
+
+
+def peer_chain(indices, prev='0'):
+    """Hash'leri ve bağlantıları geçerli, index'leri verilen sırada olan blok dict'leri."""
+    blocks = []
+    for i, index in enumerate(indices):
+        alerts = [] if i == 0 else [{'sender': 'peer', 'type': 'AI_ANOMALY_DETECTED',
+                                     'confidence': 0.5, 'timestamp': 1700000000.0 + i}]
+        block = {'index': index, 'timestamp': 1700000000.0 + i, 'alerts': alerts,
+                 'merkle_root': merkle_root(alerts), 'previous_hash': prev, 'sender': 'peer'}
+        block['hash'] = prev = Blockchain.calculate_hash(block)
+        blocks.append(block)
+    return blocks
+
+
+def test_full_chain_with_sequential_indices_is_valid():
+    assert Blockchain().validate_extension(0, peer_chain([1, 2, 3, 4]))
+
+
+def test_forged_indices_are_rejected():
+    blockchain = Blockchain()
+    assert not blockchain.validate_extension(0, peer_chain([1, 7, 7, 1]))
+    assert not blockchain.validate_extension(0, peer_chain([2, 3, 4]))
+    assert not blockchain.validate_extension(0, peer_chain([1, 2.0, 3]))
+
+
+def test_extension_must_continue_from_fork_point():
+    blockchain = Blockchain()
+    tip = blockchain.get_last_block()['hash']
+    assert blockchain.validate_extension(1, peer_chain([2, 3], prev=tip))
+    assert not blockchain.validate_extension(1, peer_chain([3, 4], prev=tip))
@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+
+from core.np_detector import check_parity
+
+MODELS = os.path.join(os.path.dirname(__file__), os.pardir, "models", "saved_models")
+
+
+def test_committed_npz_matches_torch_near_threshold():
+    max_diff, mismatches = check_parity(os.path.join(MODELS, "autoencoder.pth"),
+                                        os.path.join(MODELS, "autoencoder.npz"),
+                                        os.path.join(MODELS, "ae_threshold.npy"))
+    assert mismatches == 0
+    assert max_diff <= 1e-6
@@ -0,0 +1,75 @@
+"""
+Sentinel Mesh - Chain Export Encodings
+
+Generators that encode ledger blocks one at a time, so a full export is
+streamed with constant memory instead of being built as one document:
+
+    json     - the classic {"chain": [...], "length": N} document
+    ndjson   - one block per line
+    msgpack  - concatenated msgpack objects (node-to-node transfer)
+
+Any of them can be gzip-compressed on the fly with `gzip_stream`.
+msgpack is optional; HAS_MSGPACK tells callers whether it is available.
+"""
+
+import json
+import zlib
+
+from core.records import to_jsonable
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    msgpack = None
+    HAS_MSGPACK = False
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def encode_json(obj):
+    return json.dumps(obj, separators=(',', ':'), default=to_jsonable).encode()
+
+
+def encode_msgpack(obj):
+    return msgpack.packb(obj, default=to_jsonable, use_bin_type=True)
+
+
+def decode_msgpack(data):
+    return msgpack.unpackb(data, raw=False)
+
+
+def iter_chain_json(blocks, length):
+    """Stream the legacy {"chain": [...], "length": N} document block by block."""
+    yield b'{"chain":['
+    for i, block in enumerate(blocks):
+        yield (b',' if i else b'') + encode_json(block)
+    yield b'],"length":' + str(length).encode() + b'}'
+
+
+def iter_chain_ndjson(blocks):
+    for block in blocks:
+        yield encode_json(block) + b'\n'
+
+
+def iter_chain_msgpack(blocks):
+    """Concatenated msgpack blocks; read back with msgpack.Unpacker."""
+    for block in blocks:
+        yield encode_msgpack(block)
+
+
+def gzip_stream(chunks, level=6):
+    """gzip-compress a byte stream incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip başlığı
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def gzip_bytes(data, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
@@ -10,6 +10,44 @@ def load_scaler(path='utils/scaler.pkl'):
         print(f"⚠️ Uyarı: {path} bulunamadı!")
         return None
 
+class DatasetReader:
+    """
+    Uzun ömürlü veri seti okuyucu: .npy dosyasını bir kez mmap ile açar ve
+    tüm okumalarda aynı tutamacı kullanır.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = np.load(path, mmap_mode='r')
+
+    def __len__(self):
+        return len(self.data)
+
+    def sample(self, index):
+        """Tek bir satırı (1, n_features) şeklinde döndürür."""
+        if index >= len(self.data):
+            index = 0
+        return np.array(self.data[index]).reshape(1, -1)
+
+    def rows(self, indices):
+        """Birden fazla satırı tek seferde, bellek içi bir kopya olarak döndürür."""
+        return np.asarray(self.data[np.asarray(indices) % len(self.data)])
+
+    def iter_chunks(self, chunk_rows=4096, start=0, stop=None):
+        """Dosyayı baştan sona sabit boyutlu bloklar halinde gezer; yalnızca o blok okunur."""
+        stop = len(self.data) if stop is None else min(stop, len(self.data))
+        for offset in range(start, stop, chunk_rows):
+            yield offset, np.array(self.data[offset:min(offset + chunk_rows, stop)])
+
+_READERS = {}
+
+def get_reader(path='data/processed/X_test_scaled.npy'):
+    """Her dosya için tek bir DatasetReader örneği tutar (istek başına yeniden açılmaz)."""
+    reader = _READERS.get(path)
+    if reader is None:
+        reader = _READERS[path] = DatasetReader(path)
+    return reader
+
 def get_test_sample(path='data/processed/X_test_scaled.npy', index=0):
     """
     Test veri setinden simülasyon için tek bir satır veri çeker.
@@ -17,17 +55,87 @@ def get_test_sample(path='data/processed/X_test_scaled.npy', index=0):
     """
     try:
         # mmap_mode='r' sayesinde devasa dosyayı RAM'e yüklemeden sadece ilgili satırı okuruz
-        data = np.load(path, mmap_mode='r')
-        if index < len(data):
-            return data[index].reshape(1, -1)
-        else:
-            return data[0].reshape(1, -1)
+        return get_reader(path).sample(index)
     except Exception as e:
         print(f"⚠️ Test verisi okuma hatası: {e}")
         return None
 
+def scaler_to_affine(scaler):
+    """
+    MinMaxScaler'ı tek bir vektörel afin adıma (x * scale + offset) indirger.
+    Böylece her istekte sklearn.transform çağrısının ek yükü ortadan kalkar.
+    """
+    scale = np.asarray(scaler.scale_, dtype=np.float32)
+    offset = np.asarray(scaler.min_, dtype=np.float32)
+    # clip=True ise çıktı scaler'ın kendi aralığına (feature_range) kırpılır, (0, 1) varsayılmaz
+    clip = tuple(scaler.feature_range) if getattr(scaler, 'clip', False) else None
+    return scale, offset, clip
+
+def apply_affine(chunk, affine):
+    """Ölçeklemeyi float32 kopya üzerinde yerinde (in-place) uygular."""
+    scale, offset, clip = affine
+    out = np.array(chunk, dtype=np.float32)
+    out *= scale
+    out += offset
+    if clip is not None:
+        np.clip(out, clip[0], clip[1], out=out)
+    return out
+
 def preprocess_data(raw_data, scaler):
     """Ham veriyi modelin anlayacağı 0-1 arasına ölçekler."""
     if scaler:
-        return scaler.transform(raw_data)
+        return apply_affine(raw_data, scaler_to_affine(scaler))
     return raw_data
+
+def iter_npy_chunks(stream, chunk_rows=4096):
+    """
+    Bir .npy gövdesini (dosya veya HTTP akışı) tamamını belleğe almadan
+    sabit boyutlu satır blokları halinde okur.
+    """
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    if fortran_order or len(shape) != 2:
+        raise ValueError("Expected a C-ordered 2-D array")
+
+    n_rows, n_cols = shape
+    row_bytes = n_cols * dtype.itemsize
+    remaining = n_rows
+    while remaining > 0:
+        rows = min(chunk_rows, remaining)
+        buf = _read_exact(stream, rows * row_bytes)
+        yield np.frombuffer(buf, dtype=dtype).reshape(rows, n_cols)
+        remaining -= rows
+
+def iter_csv_chunks(stream, chunk_rows=4096, delimiter=','):
+    """CSV satırlarını akış halinde okuyup sayısal bloklara çevirir; başlık satırı atlanır."""
+    lines = []
+    first = True
+    for raw_line in stream:
+        line = raw_line.decode() if isinstance(raw_line, bytes) else raw_line
+        if not line.strip():
+            continue
+        if first:
+            first = False
+            try:
+                float(line.split(delimiter)[0])
+            except ValueError:
+                continue  # Başlık satırı
+        lines.append(line)
+        if len(lines) == chunk_rows:
+            yield np.loadtxt(lines, delimiter=delimiter, dtype=np.float32, ndmin=2)
+            lines = []
+    if lines:
+        yield np.loadtxt(lines, delimiter=delimiter, dtype=np.float32, ndmin=2)
+
+def _read_exact(stream, size):
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            raise ValueError("Unexpected end of .npy stream")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)